@@ -1,312 +1,206 @@
 import streamlit as st
 import pandas as pd
-from google.cloud import vision
-from google.oauth2 import service_account
-import cv2
-import numpy as np
-import os
-import re
-from thefuzz import process
-import gspread
-from datetime import datetime, timedelta, timezone
 import json
+from circles import history_path, load_registry
+from ocr_worker import OcrWorker, ACTIVE, FAILED, CANCELLED
+from ocr_cache import OcrCache
+from history_store import HistoryStore
+from instrument import run
+from sheet_session import get_credentials, get_sheet_session
+from sheet_commit import commit_daily
+from roster import apply_roster_changes
 
 # --- 설정 ---
-FIXED_SHEET_URL = "https://docs.google.com/spreadsheets/d/18iVfULr8tjVB8FvZ1yfMuZhua2EDxRuwfut9k201_tI/edit?gid=19537121#gid=19537121"
+REGISTRY = load_registry()
+STREAM_REFRESH_SEC = 1.0   # OCR 처리 중 결과 표 갱신 주기
 
 st.set_page_config(page_title="서클 관리자 (Admin)", layout="wide", page_icon="🛠️")
 st.title("🛠️ 우마무스메 서클 관리자 (Admin Only)")
 
-# --- [핵심] 인증 처리 함수 (클라우드/로컬 자동 감지) ---
-def get_credentials():
-    # 1. Streamlit Cloud 비밀 금고에 있는지 확인
-    if "gcp_service_account" in st.secrets:
-        return service_account.Credentials.from_service_account_info(
-            st.secrets["gcp_service_account"]
-        )
-    # 2. 로컬 파일(secret.json)이 있는지 확인 (테스트용)
-    elif os.path.exists("secret.json"):
-        return service_account.Credentials.from_service_account_file("secret.json")
-    else:
-        return None
+@st.cache_resource
+def get_ocr_cache():
+    return OcrCache()
 
-# --- 나머지 함수들 ---
-def get_gc_client(creds):
-    scope = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
-    scoped_creds = creds.with_scopes(scope)
-    return gspread.authorize(scoped_creds)
+@st.cache_resource
+def get_history_store(circle_id):
+    # 로컬 사본은 스프레드시트마다 따로
+    return HistoryStore(history_path(circle_id, REGISTRY))
 
+# --- 나머지 함수들 ---
 def fetch_members(sheet_url, creds):
     try:
-        gc = get_gc_client(creds)
-        sh = gc.open_by_url(sheet_url)
-        try: ws = sh.worksheet("2.일간_전체")
+        try: ws = get_sheet_session(sheet_url, creds).worksheet("2.일간_전체")
         except: return []
         col_values = ws.col_values(1)
         return [str(name).strip() for name in col_values if str(name).strip() and name != '닉네임']
     except: return []
 
-def add_member(sheet_url, creds, nickname):
-    gc = get_gc_client(creds)
-    sh = gc.open_by_url(sheet_url)
-    try: ws = sh.worksheet("2.일간_전체")
-    except: ws = sh.add_worksheet("2.일간_전체", 100, 20)
-    existing = [str(x).strip() for x in ws.col_values(1)]
-    if nickname.strip() in existing: return False
-    ws.append_row([nickname.strip()])
-    return True
-
-def delete_members(sheet_url, creds, nicknames_to_delete):
-    gc = get_gc_client(creds)
-    sh = gc.open_by_url(sheet_url)
-    ws = sh.worksheet("2.일간_전체")
-    all_values = [str(x).strip() for x in ws.col_values(1)]
-    rows_to_delete = []
-    for i, val in enumerate(all_values):
-        if val in nicknames_to_delete: rows_to_delete.append(i + 1)
-    for row_idx in sorted(rows_to_delete, reverse=True): ws.delete_rows(row_idx)
-    return True
-
-def rename_member(sheet_url, creds, old_name, new_name):
-    gc = get_gc_client(creds)
-    sh = gc.open_by_url(sheet_url)
-    ws = sh.worksheet("2.일간_전체")
-    all_values = [str(x).strip() for x in ws.col_values(1)]
-    if new_name.strip() in all_values: return False, "이미 존재하는 닉네임"
-    try:
-        row_idx = all_values.index(old_name.strip()) + 1
-        ws.update_cell(row_idx, 1, new_name.strip())
-        return True, "변경 성공"
-    except ValueError: return False, "대상 없음"
-
-def clean_nickname_simple(text):
-    garbage_words = ['총','최종','획득','로그인','팬','수','팬수','RANK','Rank','pt','PT','서브','리더','멤버']
-    for word in garbage_words: text = text.replace(word, '')
-    text = re.sub(r'\[\s+', '[', text)
-    text = re.sub(r'\s+\]', ']', text)
-    text = re.sub(r'[\(\)\{\}iIl\|1C<>①②③★\-\:0-9\.,]+', '', text) 
-    return text.strip()
-
-def match_nickname(ocr_text, db_list):
-    if not db_list or not ocr_text: return ocr_text
-    clean_ocr = re.sub(r'\[.*?\]', '', ocr_text).strip()
-    if not clean_ocr: return ocr_text
-    best_match, score = process.extractOne(clean_ocr, db_list)
-    if score >= 50: return best_match
-    return ocr_text
-
-def run_ocr_original(image_bytes, creds, member_db):
-    nparr = np.frombuffer(image_bytes, np.uint8)
-    img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-    h, w = img.shape[:2]
-    crop_img = img[int(h*0.4):, :] 
-    _, encoded_crop = cv2.imencode('.jpg', crop_img)
-    crop_bytes = encoded_crop.tobytes()
-
-    if img.shape[0] < 2000: img = cv2.resize(img, None, fx=2.0, fy=2.0, interpolation=cv2.INTER_CUBIC)
-    _, encoded_img = cv2.imencode('.jpg', img)
-    content = encoded_img.tobytes()
-    
-    client = vision.ImageAnnotatorClient(credentials=creds)
-    image = vision.Image(content=content)
-    try:
-        response = client.text_detection(image=image)
-        texts = response.text_annotations
-    except: return [], crop_bytes
-
-    data_list = []
-    if len(texts) > 1:
-        all_texts = texts[1:]
-        img_width = img.shape[1]
-        fan_anchors = []
-        for t in all_texts:
-            raw = t.description.replace(',', '').strip()
-            match = re.search(r'(\d{4,})', raw)
-            if match:
-                val = int(match.group(1))
-                if val > 10000000000: val = int(str(val)[1:])
-                box = t.bounding_poly.vertices
-                fan_anchors.append({'val': val, 'lx': box[0].x, 'ty': box[0].y, 'by': box[2].y})
-        u_anchors = []
-        for a in fan_anchors:
-            if not any(abs(a['ty'] - u['ty']) < 30 for u in u_anchors): u_anchors.append(a)
-        
-        for anc in u_anchors:
-            frags = []
-            for t in all_texts:
-                box = t.bounding_poly.vertices
-                cx, cy = (box[0].x + box[1].x)/2, (box[0].y + box[2].y)/2
-                if not (anc['ty']-100 < cy < anc['by']+100): continue
-                if cx >= anc['lx'] or cx < img_width*0.02: continue
-                if re.search(r'^\d+$', t.description.replace(',','')): continue
-                frags.append((box[0].x, t.description.strip()))
-            if frags:
-                frags.sort(key=lambda x: x[0])
-                full = " ".join([f[1] for f in frags])
-                cleaned = clean_nickname_simple(full)
-                if cleaned:
-                    corrected = match_nickname(cleaned, member_db)
-                    data_list.append({'닉네임': corrected, '팬 수': anc['val']})
-    return data_list, crop_bytes
-
-def commit_to_sheet(sheet_url, creds, confirmed_df):
-    gc = get_gc_client(creds)
-    sh = gc.open_by_url(sheet_url)
-    sheet_names = ["1.메인_요약", "2.일간_전체", "3.주간_기록", "4.월간_누적"]
-    existing_titles = [ws.title for ws in sh.worksheets()]
-    worksheets = {}
-    for name in sheet_names:
-        if name not in existing_titles: sh.add_worksheet(name, 100, 20)
-        worksheets[name] = sh.worksheet(name)
-    ws_daily = worksheets["2.일간_전체"]
-    daily_data = ws_daily.get_all_values()
-    KST = timezone(timedelta(hours=9))
-    today_str = datetime.now(KST).strftime("%Y-%m-%d")
-    log_messages = [] 
-    
-    if not daily_data:
-        df_daily = confirmed_df.copy()
-        df_daily.columns = ['닉네임', today_str]
-        for _, row in confirmed_df.iterrows():
-            log_messages.append(f"🆕 **{row['닉네임']}**: 신규 생성 -> {row['팬 수']:,}")
-    else:
-        header = daily_data[0]
-        if '닉네임' not in header: header[0] = '닉네임'
-        df_daily = pd.DataFrame(daily_data[1:], columns=header)
-        if today_str not in df_daily.columns: df_daily[today_str] = ""
-        df_daily['닉네임'] = df_daily['닉네임'].astype(str).str.strip()
-        df_daily.set_index('닉네임', inplace=True)
-        official_members = df_daily.index.tolist()
-
-        for _, row in confirmed_df.iterrows():
-            user_input_nick = str(row['닉네임']).strip()
-            new_val = row['팬 수']
-            target_nick = user_input_nick
-            if user_input_nick in official_members: target_nick = user_input_nick
-            else:
-                match, score = process.extractOne(user_input_nick, official_members)
-                if match and score >= 80: target_nick = match
-            
-            if target_nick in df_daily.index:
-                old_val = df_daily.at[target_nick, today_str]
-                try: old_val_int = int(str(old_val).replace(',',''))
-                except: old_val_int = None
-                df_daily.at[target_nick, today_str] = new_val
-                if old_val_int != new_val:
-                    prev_str = f"{old_val_int:,}" if old_val_int is not None else "(없음)"
-                    log_messages.append(f"✅ **{target_nick}**: {today_str} {prev_str} ➝ **{new_val:,}**")
-            else:
-                new_row = pd.Series({today_str: new_val})
-                df_to_add = pd.DataFrame([new_row], index=[target_nick])
-                df_daily = pd.concat([df_daily, df_to_add])
-                log_messages.append(f"🆕 **{target_nick}**: {today_str} (신규) ➝ **{new_val:,}**")
-        df_daily.reset_index(inplace=True)
-        df_daily = df_daily.fillna("")
-    
-    ws_daily.clear()
-    ws_daily.update([df_daily.columns.values.tolist()] + df_daily.values.tolist())
-    
-    # 주간/월간 업데이트 (간략화)
-    ws_weekly = worksheets["3.주간_기록"]
-    cols = df_daily.columns.tolist()
-    target_days = ['01', '08', '15', '22', '29']
-    weekly_cols = ['닉네임']
-    for col in cols:
-        if col != '닉네임' and col.split('-')[2] in target_days: weekly_cols.append(col)
-    valid_weekly = [c for c in weekly_cols if c in df_daily.columns]
-    df_weekly = df_daily[valid_weekly].copy()
-    ws_weekly.clear()
-    ws_weekly.update([df_weekly.columns.values.tolist()] + df_weekly.values.tolist())
-
-    ws_monthly = worksheets["4.월간_누적"]
-    month_map = {}
-    for col in cols:
-        if col != '닉네임':
-            m_prefix = col[:7]
-            if m_prefix not in month_map or col > month_map[m_prefix]: month_map[m_prefix] = col
-    monthly_cols = ['닉네임'] + sorted(list(month_map.values()))
-    valid_monthly = [c for c in monthly_cols if c in df_daily.columns]
-    df_monthly = df_daily[valid_monthly].copy()
-    ws_monthly.clear()
-    ws_monthly.update([df_monthly.columns.values.tolist()] + df_monthly.values.tolist())
-    return log_messages
+def apply_member_changes(sheet_url, creds, ops):
+    return apply_roster_changes(get_sheet_session(sheet_url, creds), ops)
+
+def commit_to_sheet(circle, creds, confirmed_df):
+    return commit_daily(get_sheet_session(circle.sheet_url, creds), get_history_store(circle.id), confirmed_df)
+
+def show_metrics(rec, title):
+    """구간별 소요 시간 / 호출 수 (계측이 꺼져 있으면 표시 안 함)"""
+    if rec is None: return
+    with st.expander(f"⏱️ {title} 소요 시간: {rec.wall:.2f}초"):
+        st.dataframe(pd.DataFrame(rec.table()), hide_index=True, use_container_width=True)
+        if rec.counters: st.caption(" · ".join(f"{k}: {v:,}" for k, v in sorted(rec.counters.items())))
+
+def get_ocr_worker(creds):
+    # 세션마다 하나, rerun 되어도 같은 worker 를 계속 씀
+    if 'ocr_worker' not in st.session_state:
+        st.session_state.ocr_worker = OcrWorker(creds, cache=get_ocr_cache())
+    return st.session_state.ocr_worker
+
+STAGING_COLS = ['닉네임', '팬 수']
+
+def reset_staging(worker):
+    worker.clear()
+    st.session_state.upload_round += 1   # 업로더/편집 표 위젯 새로 만들기
+    st.session_state.staging = None      # 편집 표 원본 (이전 수정 내용 포함)
+    st.session_state.staging_edited = None
+    st.session_state.staging_seen = 0    # staging 에 이미 붙인 worker 행 수
+
+def staging_frame(worker):
+    """편집 표에 넣을 원본 → (df, 위젯 key).
+    새로 끝난 worker 행이 있을 때만 지금까지 수정한 표 뒤에 붙이고 위젯을 새로 만듦.
+    그 사이에는 같은 원본을 넘기므로 data_editor 의 수정 내용이 유지됨"""
+    rows = worker.rows()
+    seen = st.session_state.staging_seen
+    if st.session_state.staging is None or len(rows) > seen:
+        base = st.session_state.staging_edited
+        if base is None: base = pd.DataFrame(columns=STAGING_COLS)
+        new = pd.DataFrame(rows[seen:], columns=STAGING_COLS)
+        st.session_state.staging = pd.concat([base, new], ignore_index=True) if not base.empty else new
+        st.session_state.staging_seen = len(rows)
+        st.session_state.staging_ver = st.session_state.get('staging_ver', 0) + 1
+    return st.session_state.staging, f"staging_{st.session_state.upload_round}_{st.session_state.staging_ver}"
+
+def switch_circle():
+    # 명단/예약 작업/OCR 결과는 서클마다 다르므로 전부 비움
+    st.session_state.member_db = []
+    st.session_state.roster_ops = []
+    st.session_state.roster_report = None
+    st.session_state.commit_result = None
+    if 'ocr_worker' in st.session_state: reset_staging(st.session_state.ocr_worker)
+
+def ocr_panel(worker, streaming, circle):
+    """작업 목록 + 완료된 만큼의 검토 표. 처리 중에는 fragment 로 주기적으로 다시 그림"""
+    if streaming and not worker.busy: st.rerun()   # 다 끝나면 전체 rerun 으로 자동 갱신 중지
+    jobs = worker.snapshot()
+    if not jobs: return
+    done = sum(j['상태'] not in ACTIVE for j in jobs)
+    st.progress(done / len(jobs), text=f"{done}/{len(jobs)} 장 처리")
+    for j in jobs:
+        c_name, c_status, c_btn = st.columns([5, 3, 1])
+        c_name.caption(j['파일'])
+        c_status.caption(f"{j['상태']} ({j['행 수']}행)" if not j['오류'] else f"{j['상태']}: {j['오류']}")
+        if j['상태'] in ACTIVE and c_btn.button("취소", key=f"cancel_{j['id']}"):
+            worker.cancel(j['id'])
+            st.rerun()
+        elif j['상태'] in (FAILED, CANCELLED) and c_btn.button("재시도", key=f"retry_{j['id']}"):
+            worker.retry(j['id'])
+            st.rerun()
+    if not streaming: show_metrics(worker.metrics, "분석")
+
+    col_img, col_table = st.columns([4, 6])
+    with col_img:
+        for name, thumb in worker.thumbs(): st.image(thumb, caption=name)
+    with col_table:
+        # 완료된 이미지 결과는 수정한 표 뒤에 붙으므로 검토 중 수정한 내용은 그대로 유지됨
+        staging, editor_key = staging_frame(worker)
+        edited_df = st.data_editor(staging, num_rows="dynamic", use_container_width=True, key=editor_key)
+        st.session_state.staging_edited = edited_df
+        if streaming: st.caption("처리 중… 완료된 이미지 결과부터 검토할 수 있습니다.")
+        elif staging.empty: st.error("인식 실패")
+        if st.button("✅ 시트 반영", disabled=streaming or edited_df.empty):
+            confirmed = edited_df.dropna(subset=['닉네임', '팬 수']).sort_values('팬 수', ascending=False).drop_duplicates('닉네임')
+            with run("commit") as rec:
+                logs = commit_to_sheet(circle, creds, confirmed)
+            st.session_state.commit_result = (logs, rec)
+            reset_staging(worker)
+            st.rerun()
+        if st.button("🗑️ 취소"):
+            reset_staging(worker)
+            st.rerun()
 
 # --- Main UI ---
 if 'member_db' not in st.session_state: st.session_state.member_db = []
-if 'staging_data' not in st.session_state: st.session_state.staging_data = None
-if 'uploaded_images' not in st.session_state: st.session_state.uploaded_images = []
+if 'upload_round' not in st.session_state: st.session_state.upload_round = 0
+if 'staging_seen' not in st.session_state: st.session_state.staging, st.session_state.staging_edited, st.session_state.staging_seen = None, None, 0
+if 'roster_ops' not in st.session_state: st.session_state.roster_ops = []
+if st.session_state.get('circle') not in REGISTRY: st.session_state.circle = next(iter(REGISTRY))
 
 creds = get_credentials()
 
 with st.sidebar:
     st.header("⚙️ 관리자 설정")
+    if len(REGISTRY) > 1:
+        st.selectbox("서클", list(REGISTRY), format_func=lambda cid: REGISTRY[cid].name, key='circle', on_change=switch_circle)
+    circle = REGISTRY[st.session_state.circle]
     if not creds:
         st.error("❌ 인증키(Secrets) 설정이 필요합니다.")
         st.info("Streamlit Dashboard > Settings > Secrets 에 'gcp_service_account'를 추가하세요.")
     else:
         st.success("✅ 서버 인증 완료")
+        st.caption(f"시트 API 호출 (이 세션): {st.session_state.get('sheet_api_calls', 0)}회")
         
         st.markdown("---")
         st.header("👤 서클원 관리")
         if st.button("🔄 명단 새로고침") or not st.session_state.member_db:
-            st.session_state.member_db = fetch_members(FIXED_SHEET_URL, creds)
+            st.session_state.member_db = fetch_members(circle.sheet_url, creds)
         
+        # 추가/변경/삭제는 큐에 쌓았다가 한 번에 반영
         new_mem = st.text_input("닉네임 추가")
-        if new_mem and st.button("추가 실행"):
-            if add_member(FIXED_SHEET_URL, creds, new_mem):
-                st.success(f"{new_mem} 추가됨")
-                st.session_state.member_db.append(new_mem)
-                st.rerun()
+        if new_mem and st.button("추가 예약"):
+            st.session_state.roster_ops.append(('add', new_mem))
 
         if st.session_state.member_db:
             st.markdown("---")
             target_mem = st.selectbox("변경할 닉네임", st.session_state.member_db)
             changed_name = st.text_input("새 닉네임")
-            if st.button("✏️ 변경 실행"):
-                success, msg = rename_member(FIXED_SHEET_URL, creds, target_mem, changed_name)
-                if success:
-                    st.success("변경 완료")
-                    st.rerun()
-                else: st.error(msg)
-            
+            if changed_name and st.button("✏️ 변경 예약"):
+                st.session_state.roster_ops.append(('rename', target_mem, changed_name))
+
             st.markdown("---")
             del_mem = st.multiselect("삭제할 닉네임", st.session_state.member_db)
-            if del_mem and st.button("❌ 삭제 실행"):
-                delete_members(FIXED_SHEET_URL, creds, del_mem)
-                st.success("삭제 완료")
+            if del_mem and st.button("❌ 삭제 예약"):
+                st.session_state.roster_ops.extend(('delete', m) for m in del_mem)
+
+        if st.session_state.roster_ops:
+            st.markdown("---")
+            st.subheader(f"📝 대기 중인 변경 ({len(st.session_state.roster_ops)}건)")
+            for op in st.session_state.roster_ops:
+                st.caption(f"삭제: {op[1]}" if op[0] == 'delete' else f"변경: {op[1]} → {op[2]}" if op[0] == 'rename' else f"추가: {op[1]}")
+            c_apply, c_clear = st.columns(2)
+            if c_apply.button("💾 일괄 반영"):
+                report, members = apply_member_changes(circle.sheet_url, creds, st.session_state.roster_ops)
+                st.session_state.roster_ops = []
+                st.session_state.member_db = members
+                st.session_state.roster_report = report
+                st.rerun()
+            if c_clear.button("비우기"):
+                st.session_state.roster_ops = []
                 st.rerun()
 
+        if st.session_state.get('roster_report'):
+            for r in st.session_state.roster_report:
+                (st.success if r['결과'] else st.error)(f"{r['작업']} {r['닉네임']}: {r['메시지']}")
+
 if creds:
-    if st.session_state.staging_data is None:
-        st.subheader("📸 데이터 업데이트 (OCR)")
-        files = st.file_uploader("이미지 파일", accept_multiple_files=True)
-        if files and st.button("🔍 분석 시작"):
-            st.session_state.uploaded_images = []
-            temp_data = []
-            bar = st.progress(0)
-            for i, f in enumerate(files):
-                data_list, crop_img = run_ocr_original(f.getvalue(), creds, st.session_state.member_db)
-                temp_data.extend(data_list)
-                st.session_state.uploaded_images.append(crop_img)
-                bar.progress((i+1)/len(files))
-            if temp_data:
-                st.session_state.staging_data = pd.DataFrame(temp_data).sort_values('팬 수', ascending=False).drop_duplicates('닉네임')
-                st.rerun()
-            else: st.error("인식 실패")
-    else:
-        col_img, col_table = st.columns([4, 6])
-        with col_img:
-            for idx, img_bytes in enumerate(st.session_state.uploaded_images):
-                st.image(img_bytes, caption=f"이미지 {idx+1}")
-        with col_table:
-            edited_df = st.data_editor(st.session_state.staging_data, num_rows="dynamic", use_container_width=True)
-            if st.button("✅ 시트 반영"):
-                logs = commit_to_sheet(FIXED_SHEET_URL, creds, edited_df)
-                st.success("완료!")
-                for log in logs: st.markdown(log)
-                st.session_state.staging_data = None
-                st.session_state.uploaded_images = []
-            if st.button("🗑️ 취소"):
-                st.session_state.staging_data = None
-                st.session_state.uploaded_images = []
-                st.rerun()
\ No newline at end of file
+    worker = get_ocr_worker(creds)
+    if st.session_state.get('commit_result'):
+        logs, rec = st.session_state.commit_result
+        st.success("완료!")
+        show_metrics(rec, "시트 반영")
+        for log in logs: st.markdown(log)
+
+    st.subheader("📸 데이터 업데이트 (OCR)")
+    # 올리는 즉시 백그라운드에서 한 장씩 처리 (이미 받은 이미지는 건너뜀)
+    files = st.file_uploader("이미지 파일", accept_multiple_files=True, key=f"uploader_{st.session_state.upload_round}")
+    if files and worker.submit([(f.name, f.getvalue()) for f in files], st.session_state.member_db):
+        st.session_state.commit_result = None
+    refresh = STREAM_REFRESH_SEC if worker.busy else None
+    st.fragment(run_every=refresh)(ocr_panel)(worker, refresh is not None, circle)
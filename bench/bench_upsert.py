@@ -0,0 +1,76 @@
+"""일간 표 upsert 마이크로 벤치마크: 예전 iterrows 루프 vs daily_table.upsert_daily
+
+    python bench/bench_upsert.py
+"""
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from daily_table import upsert_daily  # noqa: E402
+from nickname_index import NicknameIndex  # noqa: E402
+
+TODAY = "2026-10-17"
+SIZES = [30, 300, 1000, 5000]
+
+def make_case(n, n_days=30, new_ratio=0.1, seed=0):
+    rng = np.random.default_rng(seed)
+    names = [f"멤버{i:05d}" for i in range(n)]
+    dates = [str(d.date()) for d in pd.date_range(end=TODAY, periods=n_days)]
+    df = pd.DataFrame(rng.integers(10**6, 10**9, (n, n_days)).astype(str), columns=dates, dtype=object)
+    df[TODAY] = ""
+    df.insert(0, '닉네임', names)
+    df = df.set_index('닉네임')
+    n_new = int(n * new_ratio)
+    confirmed = pd.DataFrame({
+        '닉네임': names[:n - n_new] + [f"신규{i:05d}" for i in range(n_new)],
+        '팬 수': rng.integers(10**6, 10**9, n).tolist(),
+    })
+    return df, confirmed
+
+def legacy_upsert(df_daily, confirmed_df, today_str, index):
+    official_members = df_daily.index.tolist()
+    log_messages = []
+    for _, row in confirmed_df.iterrows():
+        user_input_nick = str(row['닉네임']).strip()
+        new_val = row['팬 수']
+        target_nick = user_input_nick
+        if user_input_nick not in official_members:
+            match, score = index.best_matches([user_input_nick])[0]
+            if match and score >= 80: target_nick = match
+        if target_nick in df_daily.index:
+            old_val = df_daily.at[target_nick, today_str]
+            try: old_val_int = int(str(old_val).replace(',', ''))
+            except: old_val_int = None
+            df_daily.at[target_nick, today_str] = new_val
+            if old_val_int != new_val:
+                prev_str = f"{old_val_int:,}" if old_val_int is not None else "(없음)"
+                log_messages.append(f"✅ **{target_nick}**: {today_str} {prev_str} ➝ **{new_val:,}**")
+        else:
+            df_daily = pd.concat([df_daily, pd.DataFrame([{today_str: new_val}], index=[target_nick])])
+            log_messages.append(f"🆕 **{target_nick}**: {today_str} (신규) ➝ **{new_val:,}**")
+    return df_daily, log_messages
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    out = fn(*args)
+    return time.perf_counter() - start, out
+
+def main():
+    warnings.simplefilter('ignore')
+    print(f"{'members':>8} {'legacy(s)':>10} {'vector(s)':>10} {'speedup':>8}")
+    for n in SIZES:
+        df, confirmed = make_case(n)
+        index = NicknameIndex(df.index.tolist())
+        index.best_matches(confirmed['닉네임'].tolist())   # 퍼지 점수는 양쪽 공통이라 미리 채워 둠
+        t_old, (_, logs_old) = timed(legacy_upsert, df.copy(), confirmed, TODAY, index)
+        t_new, (_, logs_new) = timed(upsert_daily, df.copy(), confirmed, TODAY, index)
+        assert logs_old == logs_new
+        print(f"{n:>8} {t_old:>10.3f} {t_new:>10.3f} {t_old / t_new:>7.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,236 @@
+"""오프라인 벤치마크용 가짜 gspread / Vision 백엔드.
+
+시트 값은 get_all_values 처럼 문자열 격자로 들고 있고, API 호출마다 횟수를 세고
+latency 초만큼 기다려 네트워크 왕복을 흉내 냄.
+"""
+import random
+import re
+import time
+from collections import Counter
+from types import SimpleNamespace
+
+from gspread.exceptions import WorksheetNotFound
+from gspread.utils import a1_to_rowcol
+
+class CallCounter:
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = Counter()
+
+    def hit(self, name):
+        self.calls[name] += 1
+        if self.latency: time.sleep(self.latency)
+
+    @property
+    def total(self):
+        return sum(self.calls.values())
+
+def _str(v):
+    return "" if v is None else str(v)
+
+class FakeWorksheet:
+    def __init__(self, spreadsheet, title, sheet_id, grid=None):
+        self.spreadsheet = spreadsheet
+        self.title = title
+        self.id = sheet_id
+        self.grid = [[_str(v) for v in row] for row in (grid or [])]
+
+    def _hit(self, name):
+        self.spreadsheet.counter.hit(name)
+
+    def _padded(self):
+        width = max((len(r) for r in self.grid), default=0)
+        rows = [r + [""] * (width - len(r)) for r in self.grid]
+        while rows and not any(rows[-1]): rows.pop()
+        return [list(r) for r in rows]
+
+    def get_all_values(self):
+        self._hit('get_all_values')
+        return self._padded()
+
+    def get_all_records(self):
+        self._hit('get_all_records')
+        grid = self._padded()
+        if not grid: return []
+        num = re.compile(r'^-?\d+$')
+        return [{h: (int(v) if num.match(v) else v) for h, v in zip(grid[0], row)} for row in grid[1:]]
+
+    def col_values(self, col):
+        self._hit('col_values')
+        vals = [r[col - 1] if len(r) >= col else "" for r in self.grid]
+        while vals and not vals[-1]: vals.pop()
+        return vals
+
+    def batch_get(self, ranges):
+        self._hit('batch_get')
+        out = []
+        for rng in ranges:
+            if rng == 'A:A': out.append([[r[0]] if r and r[0] else [] for r in self._padded()])
+            elif rng == '1:1': out.append([self.grid[0]] if self.grid else [])
+            else: raise NotImplementedError(rng)
+        return out
+
+    def acell(self, label):
+        self._hit('acell')
+        r, c = a1_to_rowcol(label)
+        row = self.grid[r - 1] if len(self.grid) >= r else []
+        return SimpleNamespace(value=row[c - 1] if len(row) >= c else None)
+
+    def write(self, row, col, values):
+        """0-based 좌상단부터 2차원 값 쓰기 (격자가 모자라면 늘림)"""
+        for i, vals in enumerate(values):
+            r = row + i
+            while len(self.grid) <= r: self.grid.append([])
+            line = self.grid[r]
+            if len(line) < col + len(vals): line.extend([""] * (col + len(vals) - len(line)))
+            for j, v in enumerate(vals): line[col + j] = _str(v)
+
+class FakeSpreadsheet:
+    def __init__(self, latency=0.0):
+        self.counter = CallCounter(latency)
+        self.cells_sent = 0          # values_batch_update 로 보낸 셀 수 (누적)
+        self.revision = 0            # 값이 바뀔 때마다 증가 (Drive modifiedTime 대용)
+        self._sheets = {}
+
+    def seed(self, title, grid):
+        """호출 수에 안 잡히게 초기 데이터 넣기"""
+        self._sheets[title] = FakeWorksheet(self, title, len(self._sheets), grid)
+        return self._sheets[title]
+
+    def worksheets(self):
+        self.counter.hit('worksheets')
+        return list(self._sheets.values())
+
+    def worksheet(self, title):
+        self.counter.hit('worksheet')
+        if title not in self._sheets: raise WorksheetNotFound(title)
+        return self._sheets[title]
+
+    def add_worksheet(self, title, rows, cols):
+        self.counter.hit('add_worksheet')
+        return self.seed(title, [])
+
+    def get_lastUpdateTime(self):
+        self.counter.hit('drive_metadata')
+        return f"rev-{self.revision}"
+
+    def edit(self, title, row, col, value):
+        """사람이 시트에서 직접 고친 것처럼 셀 하나 쓰기 (0-based, 호출 수에 안 잡힘)"""
+        self._sheets[title].write(row, col, [[value]])
+        self.revision += 1
+
+    def values_batch_get(self, ranges):
+        self.counter.hit('values_batch_get')
+        out = []
+        for rng in ranges:
+            title, _, a1 = rng.partition('!')
+            grid = self._sheets[title.strip("'")].grid
+            if not a1: values = [list(r) for r in grid]
+            elif a1 == 'A:A': values = [[r[0]] if r and r[0] else [] for r in grid]
+            elif a1 == '1:1': values = [list(grid[0])] if grid else []
+            else: raise NotImplementedError(rng)
+            while values and not any(values[-1]): values.pop()
+            for r in values:
+                while r and not r[-1]: r.pop()      # API 는 행 끝 빈 칸을 잘라서 줌
+            out.append({'range': rng, 'values': values} if values else {'range': rng})
+        return {'valueRanges': out}
+
+    def values_batch_update(self, body):
+        self.counter.hit('values_batch_update')
+        self.revision += 1
+        for item in body['data']:
+            self.cells_sent += sum(len(row) for row in item['values'])
+            title, a1 = item['range'].rsplit('!', 1)
+            r, c = a1_to_rowcol(a1)
+            self._sheets[title.strip("'")].write(r - 1, c - 1, item['values'])
+
+    def batch_update(self, body):
+        """roster.build_requests 가 쓰는 updateCells / appendCells / deleteDimension(ROWS) 만"""
+        self.counter.hit('batch_update')
+        self.revision += 1
+        by_id = {ws.id: ws for ws in self._sheets.values()}
+        cell = lambda row: row['values'][0]['userEnteredValue']['stringValue']
+        for req in body['requests']:
+            if 'updateCells' in req:
+                r = req['updateCells']
+                by_id[r['start']['sheetId']].write(r['start']['rowIndex'], r['start']['columnIndex'], [[cell(x)] for x in r['rows']])
+            elif 'appendCells' in req:
+                ws = by_id[req['appendCells']['sheetId']]
+                ws.write(len(ws._padded()), 0, [[cell(x)] for x in req['appendCells']['rows']])
+            elif 'deleteDimension' in req:
+                rng = req['deleteDimension']['range']
+                del by_id[rng['sheetId']].grid[rng['startIndex']:rng['endIndex']]
+            else: raise NotImplementedError(req)
+
+class FakeSession:
+    """sheet_session.SheetSession 과 같은 인터페이스"""
+
+    def __init__(self, spreadsheet):
+        self._sh = spreadsheet
+        self._ws = None
+
+    @property
+    def api_calls(self):
+        return self._sh.counter.total
+
+    def spreadsheet(self):
+        return self._sh
+
+    def has_worksheet(self, name):
+        if self._ws is None: self._ws = {ws.title: ws for ws in self._sh.worksheets()}
+        return name in self._ws
+
+    def worksheet(self, name, create=False, rows=100, cols=20):
+        if not self.has_worksheet(name):
+            if not create: raise WorksheetNotFound(name)
+            self._ws[name] = self._sh.add_worksheet(name, rows, cols)
+        return self._ws[name]
+
+# --- 합성 데이터 ---
+# clean_nickname_simple 이 지우는 글자(총/팬/수/멤버 등)와 숫자가 없는 음절만 사용
+SYLLABLES = "가나다라마바사아자차카타파하고노도로모보소오조초코토포호구누두루무부우주추쿠투푸후"
+
+def make_names(n, seed=0):
+    """겹치지 않는 합성 닉네임 n 개"""
+    rng = random.Random(seed)
+    names, seen = [], set()
+    while len(names) < n:
+        name = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(3, 6)))
+        if name not in seen:
+            seen.add(name)
+            names.append(name)
+    return names
+
+# --- Vision ---
+def _box(x0, y0, x1, y1):
+    return SimpleNamespace(vertices=[SimpleNamespace(x=x0, y=y0), SimpleNamespace(x=x1, y=y0),
+                                     SimpleNamespace(x=x1, y=y1), SimpleNamespace(x=x0, y=y1)])
+
+def _text(desc, x0, y0, x1, y1):
+    return SimpleNamespace(description=desc, bounding_poly=_box(x0, y0, x1, y1))
+
+def make_annotations(names, fans, img_width=1440, row_h=260, top=40):
+    """서클원 목록 화면과 같은 배치의 text_annotations (0번은 전체 텍스트)"""
+    texts = [_text("\n".join(names), 0, 0, img_width, top + row_h * len(names))]
+    for i, (name, val) in enumerate(zip(names, fans)):
+        y = top + i * row_h
+        texts.append(_text("[서클]", 120, y, 220, y + 40))
+        texts.append(_text(name, 240, y, 520, y + 40))
+        texts.append(_text("총", 620, y + 50, 660, y + 90))
+        texts.append(_text("팬", 670, y + 50, 710, y + 90))
+        texts.append(_text(f"{val:,}", 900, y + 50, 1200, y + 90))
+    return texts
+
+class FakeVisionClient:
+    """녹화해 둔 text_annotations 를 순서대로 돌려주는 ImageAnnotatorClient 대용"""
+
+    def __init__(self, responses, latency=0.0):
+        self._responses = list(responses)
+        self.counter = CallCounter(latency)
+        self.bytes_sent = 0
+
+    def text_detection(self, image):
+        self.counter.hit('text_detection')
+        self.bytes_sent += len(image.content)
+        texts = self._responses[(self.counter.total - 1) % len(self._responses)]
+        return SimpleNamespace(text_annotations=texts)
@@ -0,0 +1,158 @@
+"""오프라인 성능 벤치마크: 가짜 Sheets / Vision 으로 OCR (업로드 → 전처리 → Vision → 파싱, OcrWorker 경로), 닉네임 보정, 시트 반영, 뷰어 로딩을 측정
+
+    python bench/run_bench.py            # 빠른 구성
+    python bench/run_bench.py --full     # 10,000 명 / 1,000 일까지
+    python bench/run_bench.py --latency 0.05   # API 호출당 지연(초)
+
+단계별 벽시계 시간, API 호출 수(종류별), tracemalloc 최대 메모리를 출력함.
+시간은 tracemalloc 을 켠 채로 재므로 절대값보다 구성/버전 간 비교용으로 볼 것.
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+import warnings
+from datetime import datetime, timedelta
+
+import cv2
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from fakes import FakeSession, FakeSpreadsheet, FakeVisionClient, make_annotations, make_names  # noqa: E402
+from history_store import HistoryStore  # noqa: E402
+from nickname_index import NicknameIndex  # noqa: E402
+from ocr_engine import match_nicknames, parse_annotations  # noqa: E402
+from ocr_worker import DONE, OcrWorker  # noqa: E402
+from sheet_commit import KST, commit_daily  # noqa: E402
+from sheet_sync import monthly_columns, select_columns, weekly_columns  # noqa: E402
+from viewer_data import fetch_data  # noqa: E402
+
+QUICK = [(30, 30), (300, 90), (1000, 365)]
+FULL = QUICK + [(3000, 365), (10000, 1000)]
+ROWS_PER_SHOT = 8          # 스크린샷 한 장에 보이는 서클원 수
+SHOT_W, SHOT_H = 1080, 2400
+NOW = datetime(2026, 10, 17, 21, 0, tzinfo=KST)
+
+def measure(fn, *args):
+    """→ (결과, 초, 최대 메모리 MB)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    out = fn(*args)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    return out, elapsed, peak
+
+def make_sheet(names, n_days, latency, seed=0):
+    """n_days 일치 기록이 있는 일간/주간/월간/요약 시트"""
+    rng = np.random.default_rng(seed)
+    dates = [(NOW - timedelta(days=n_days - i)).strftime("%Y-%m-%d") for i in range(n_days)]
+    fans = rng.integers(10**6, 10**9, (len(names), n_days))
+    daily = [['닉네임'] + dates] + [[n] + [f"{v}" for v in row] for n, row in zip(names, fans)]
+    sh = FakeSpreadsheet(latency)
+    sh.seed("1.메인_요약", [['닉네임', '현재 팬 수', '이번달 팬수']] + [[n, f"{r[-1]:,}", f"{r[-1] - r[max(0, len(r) - 30)]:,}"] for n, r in zip(names, fans)])
+    sh.seed("2.일간_전체", daily)
+    sh.seed("3.주간_기록", select_columns(daily, weekly_columns(dates)))
+    sh.seed("4.월간_누적", select_columns(daily, monthly_columns(dates)))
+    return sh, fans[:, -1]
+
+def ocr_noise(name, rng):
+    """OCR 오인식 흉내: 가끔 글자 하나 빠짐 / 태그 붙음"""
+    if len(name) > 3 and rng.random() < 0.2: name = name[:-1]
+    return f"[서클] {name}" if rng.random() < 0.3 else name
+
+def screenshots(n, seed=0):
+    """상단 바 + 목록 + 하단 메뉴 모양의 서로 다른 스크린샷 n 장 (JPEG). 목록 부분만 장마다 가로로 밀어 겹치지 않게 함"""
+    rng = np.random.default_rng(seed)
+    base = cv2.GaussianBlur(rng.integers(0, 255, (SHOT_H, SHOT_W, 3), dtype=np.uint8), (5, 5), 0)
+    shots = []
+    for i in range(n):
+        img = base.copy()
+        img[200:-150] = np.roll(base[200:-150], 37 * (i + 1), axis=1)
+        shots.append((f"{i}.jpg", cv2.imencode('.jpg', img)[1].tobytes()))
+    return shots
+
+def run_worker(files, index, client):
+    """OcrWorker 로 업로드부터 행 추출까지 (admin 과 같은 경로)"""
+    worker = OcrWorker(None, client=client)
+    worker.submit(files, index)
+    while worker.busy: time.sleep(0.002)
+    return worker
+
+def bench_ocr(names, latency, rng):
+    replies = []
+    for i in range(0, len(names), ROWS_PER_SHOT):
+        chunk = names[i:i + ROWS_PER_SHOT]
+        replies.append(make_annotations([ocr_noise(n, rng) for n in chunk], rng.integers(10**6, 10**9, len(chunk)), SHOT_W))
+    files = screenshots(len(replies))
+    client = FakeVisionClient(replies, latency)
+    index = NicknameIndex(names)
+    worker, t, mem = measure(run_worker, files, index, client)
+    rows = worker.rows()
+    hit = sum(r['닉네임'] in set(names) for r in rows) / max(1, len(rows))
+    # 파싱만 (Vision 응답 재사용)
+    _, t_parse, _ = measure(lambda: [parse_annotations(s, SHOT_W, index) for s in replies])
+    return {'shots': len(files), 'rows': len(rows), 'match%': round(hit * 100, 1), 'ocr_s': t, 'parse_s': t_parse,
+            'ocr_mb': mem, 'vision': client.counter.total, 'vision_kb': client.bytes_sent / 1024,
+            'failed': sum(j['상태'] != DONE for j in worker.snapshot())}
+
+def bench_match(names, rng):
+    queries = [ocr_noise(n, rng) for n in names]
+    _, cold, mem = measure(match_nicknames, queries, NicknameIndex(names))
+    return {'match_s': cold, 'match_mb': mem}
+
+def bench_commit(names, n_days, latency, rng):
+    sh, last = make_sheet(names, n_days, latency)
+    session = FakeSession(sh)
+    store = HistoryStore(":memory:")
+    out = {}
+    for label, now in [('cold', NOW), ('warm', NOW + timedelta(minutes=5))]:
+        confirmed = pd.DataFrame({'닉네임': names, '팬 수': (last + rng.integers(0, 10**5, len(names))).tolist()})
+        before = sh.counter.calls.copy()
+        _, t, mem = measure(commit_daily, session, store, confirmed, now)
+        calls = sh.counter.calls - before
+        out[f'commit_{label}_s'] = t
+        out[f'commit_{label}_mb'] = mem
+        out[f'commit_{label}_calls'] = dict(calls)
+    return out, session
+
+def bench_viewer(session):
+    before = session.spreadsheet().counter.calls.copy()
+    (df, global_date, _, search), t, mem = measure(fetch_data, session)
+    _, t_search, _ = measure(lambda: [search.search(q) for q in ['가나', 'ㄱㄴ', '나다라', '가나다라마바']])
+    calls = session.spreadsheet().counter.calls - before
+    return {'view_s': t, 'view_mb': mem, 'search_s': t_search, 'view_calls': dict(calls), 'last_date': global_date}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--full', action='store_true', help="10,000 명 / 1,000 일까지")
+    parser.add_argument('--latency', type=float, default=0.0, help="API 호출당 지연(초)")
+    args = parser.parse_args()
+    warnings.simplefilter('ignore')
+
+    for n_members, n_days in (FULL if args.full else QUICK):
+        rng = np.random.default_rng(n_members)
+        names = make_names(n_members, seed=n_members)
+        res = {}
+        res.update(bench_ocr(names, args.latency, rng))
+        res.update(bench_match(names, rng))
+        commit, session = bench_commit(names, n_days, args.latency, rng)
+        res.update(commit)
+        res.update(bench_viewer(session))
+
+        print(f"\n== 멤버 {n_members:,} 명 / {n_days:,} 일 ==")
+        print(f"OCR     {res['shots']} 장 → {res['rows']} 행 (보정 일치 {res['match%']}%), "
+              f"{res['ocr_s']:.3f}s (파싱 {res['parse_s']:.3f}s), {res['ocr_mb']:.1f}MB, "
+              f"Vision {res['vision']} 회 {res['vision_kb']:,.0f}KB, 실패 {res['failed']} 장")
+        print(f"보정    {res['match_s']:.3f}s, {res['match_mb']:.1f}MB")
+        for label in ('cold', 'warm'):
+            calls = res[f'commit_{label}_calls']
+            print(f"반영({label}) {res[f'commit_{label}_s']:.3f}s, {res[f'commit_{label}_mb']:.1f}MB, "
+                  f"API {sum(calls.values())} 회 {calls}")
+        print(f"뷰어    {res['view_s']:.3f}s (검색 4회 {res['search_s'] * 1000:.1f}ms), {res['view_mb']:.1f}MB, "
+              f"API {sum(res['view_calls'].values())} 회 {res['view_calls']}, 마지막 집계일 {res['last_date']}")
+
+if __name__ == '__main__':
+    main()
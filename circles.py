@@ -0,0 +1,85 @@
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import streamlit as st
+
+from history_store import HISTORY_DB_PATH
+from sheet_session import read_version
+from versioned_cache import VersionedCache
+
+# --- 설정 ---
+DEFAULT_SHEET_URL = "https://docs.google.com/spreadsheets/d/18iVfULr8tjVB8FvZ1yfMuZhua2EDxRuwfut9k201_tI/edit?gid=19537121#gid=19537121"
+CIRCLES_FILE = "circles.json"   # {"서클 id": {"name": "...", "sheet_url": "..."}, ...}
+VERSION_POLL_SEC = 15           # 버전 스탬프 확인 주기
+FALLBACK_TTL_SEC = 600          # 메타 시트가 없을 때 재로드 주기
+FETCH_CONCURRENCY = 8
+
+Circle = namedtuple('Circle', ['id', 'name', 'sheet_url'])
+
+def load_registry():
+    """서클 id → Circle (설정 순서 유지). Secrets 의 [circles.<id>] → circles.json → 기본 서클 하나 순으로 찾음"""
+    raw = None
+    try:
+        if "circles" in st.secrets: raw = {k: dict(v) for k, v in st.secrets["circles"].items()}
+    except Exception: pass
+    if raw is None and os.path.exists(CIRCLES_FILE):
+        with open(CIRCLES_FILE, encoding='utf-8') as f: raw = json.load(f)
+    if not raw: return {"main": Circle("main", "서클", DEFAULT_SHEET_URL)}
+    return {cid: Circle(cid, conf.get('name', cid), conf['sheet_url']) for cid, conf in raw.items()}
+
+def history_path(circle_id, registry):
+    """첫 번째(기본) 서클은 기존 로컬 사본 파일을 그대로 씀"""
+    return HISTORY_DB_PATH if circle_id == next(iter(registry)) else f".history-{circle_id}.sqlite"
+
+class CircleFeed:
+    """서클 하나의 요약 데이터. 버전 스탬프는 VERSION_POLL_SEC 마다만 확인하고, 바뀌면 VersionedCache 가 다시 로드
+    프로세스당 서클마다 하나 (st.cache_resource)"""
+
+    def __init__(self, loader):
+        self.cache = VersionedCache(loader)
+        self._lock = threading.Lock()
+        self._version = None
+        self._checked = 0.0
+
+    def version(self, session):
+        with self._lock:
+            if self._version is not None and time.monotonic() - self._checked < VERSION_POLL_SEC: return self._version
+        # 메타 시트가 없으면 예전처럼 10분 단위로 새로 읽음
+        try: version = read_version(session) or f"ttl-{int(time.time() // FALLBACK_TTL_SEC)}"
+        except Exception:
+            # 일시 오류: 마지막으로 확인한 버전(= 캐시된 데이터) 유지, 다음 주기에 다시 확인
+            with self._lock:
+                if self._version is None: raise
+                self._checked = time.monotonic()
+                return self._version
+        with self._lock: self._version, self._checked = version, time.monotonic()
+        return version
+
+    def get(self, session):
+        return self.cache.get(self.version(session), session)
+
+def fetch_all(jobs, max_workers=FETCH_CONCURRENCY):
+    """jobs: {서클 id: (CircleFeed, SheetSession)} → {서클 id: 결과 또는 예외}
+    서클마다 동시에 읽으므로 전체 시간은 가장 느린 서클 기준"""
+    if not jobs: return {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(jobs))) as pool:
+        futures = {cid: pool.submit(feed.get, session) for cid, (feed, session) in jobs.items()}
+    out = {}
+    for cid, fut in futures.items():
+        try: out[cid] = fut.result()
+        except Exception as e: out[cid] = e
+    return out
+
+def cross_ranking(frames, registry, column):
+    """{서클 id: 요약 df} → 서클 열이 붙은 전체 순위표 (column 내림차순)"""
+    parts = [df.assign(서클=registry[cid].name)[['서클', '닉네임', column]]
+             for cid, df in frames.items() if not df.empty and column in df.columns]
+    if not parts: return pd.DataFrame(columns=['순위', '서클', '닉네임', column])
+    ranked = pd.concat(parts, ignore_index=True).sort_values(column, ascending=False, kind='stable')
+    ranked.insert(0, '순위', range(1, len(ranked) + 1))
+    return ranked
@@ -0,0 +1,112 @@
+import re
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+INT_RE = r'^\s*[+-]?\d+(\.0*)?\s*$'   # 편집 표 열이 float 가 되면 "150.0" 으로 들어옴 → 정수로 봄
+LAST_DATE_COL = '마지막 집계일'   # 1.메인_요약 에 admin 이 기록, user.py 가 읽음
+
+# 반영 한 번에 바뀔 수 있는 부분만: 헤더, 행별 닉네임(A열), 행별 오늘 열 값 (열이 없으면 "")
+DailySlice = namedtuple('DailySlice', ['header', 'names', 'today'])
+
+def slice_of(grid, today_str):
+    """시트 전체 값 → DailySlice"""
+    if not grid: return DailySlice([], [], [])
+    header = [str(h).strip() for h in grid[0]]
+    ci = header.index(today_str) if today_str in header else None
+    rows = grid[1:]
+    return DailySlice(header, [str(r[0]).strip() if r else '' for r in rows],
+                      [r[ci] if ci is not None and ci < len(r) else "" for r in rows])
+
+def apply_slice(grid, new, today_str):
+    """예전 시트 값에 새 DailySlice (오늘 열 / 새 행) 를 반영한 전체 grid"""
+    ci = new.header.index(today_str)
+    out = [list(new.header)]
+    for i, (name, val) in enumerate(zip(new.names, new.today)):
+        row = list(grid[i + 1]) if i + 1 < len(grid) else []
+        row += [""] * (len(new.header) - len(row))
+        row[0], row[ci] = name, val
+        out.append(row)
+    return out
+
+def parse_fans(values):
+    """시트 문자열 → 정수 (콤마, "150.0" 같은 정수 값 허용). 그 외 값은 None"""
+    s = pd.Series(values, dtype=object).astype(str).str.replace(',', '')
+    nums = pd.to_numeric(s.where(s.str.match(INT_RE)), errors='coerce').astype('Int64')
+    return nums.astype(object).where(nums.notna(), None)
+
+def to_fans(v):
+    """셀 하나용 parse_fans"""
+    s = str(v).replace(',', '')
+    return int(s.strip().split('.')[0]) if re.match(INT_RE, s) else None
+
+def resolve_targets(inputs, official_members, index, threshold=80):
+    """명단에 그대로 있으면 그대로, 아니면 한 번에 퍼지 매칭해서 threshold 이상일 때만 명단 이름으로"""
+    official_set = set(official_members)
+    to_match = [n for n in inputs if n not in official_set]
+    fuzzy = dict(zip(to_match, index.best_matches(to_match)))
+    targets = []
+    for n in inputs:
+        match, score = fuzzy.get(n, (None, 0))
+        targets.append(match if n not in official_set and match and score >= threshold else n)
+    return targets
+
+def upsert_daily(df_daily, confirmed_df, today_str, index):
+    """닉네임 index 인 일간 표에 오늘 열 값을 한 번에 반영 → (갱신된 표, 로그)
+    같은 대상이 여러 번 나오면 입력 순서대로 덮어쓴 것과 같은 결과/로그를 냄"""
+    inputs = [str(n).strip() for n in confirmed_df['닉네임']]
+    plan = pd.DataFrame({
+        'target': resolve_targets(inputs, df_daily.index.tolist(), index),
+        'new': confirmed_df['팬 수'].tolist(),
+    })
+    existing = plan['target'].isin(df_daily.index)
+    first = ~plan['target'].duplicated()
+
+    # 이전 값: 첫 등장은 시트 값, 그 다음부터는 바로 앞 입력값
+    current = df_daily[today_str]
+    current = current[~current.index.duplicated()]
+    sheet_old = parse_fans(current.reindex(plan['target']).fillna('').tolist())
+    prev_input = plan['new'].astype(object).groupby(plan['target'], sort=False).shift(1)
+    old = sheet_old.where(first, parse_fans(prev_input.fillna('').tolist()))
+    is_new = first & ~existing
+
+    changed = [o is None or o != n for o, n in zip(old, plan['new'])]
+    log_messages = []
+    for tgt, new_val, o, new_row, diff in zip(plan['target'], plan['new'], old, is_new, changed):
+        if new_row:
+            log_messages.append(f"🆕 **{tgt}**: {today_str} (신규) ➝ **{new_val:,}**")
+        elif diff:
+            prev_str = f"{o:,}" if o is not None else "(없음)"
+            log_messages.append(f"✅ **{tgt}**: {today_str} {prev_str} ➝ **{new_val:,}**")
+
+    last = plan.groupby('target', sort=False)['new'].last()   # 첫 등장 순서, 마지막 값
+    upd = last[last.index.isin(df_daily.index)]
+    df_daily.loc[upd.index, today_str] = upd.values
+    added = last[~last.index.isin(df_daily.index)]
+    if len(added):
+        new_rows = pd.DataFrame({today_str: added.values}, index=pd.Index(added.index, name=df_daily.index.name))
+        # object 로 맞춰 붙여야 기존 열 dtype 이 float 로 바뀌지 않음 (바뀌면 전 셀이 변경으로 잡힘)
+        df_daily = pd.concat([df_daily, new_rows.reindex(columns=df_daily.columns).astype(object)])
+    return df_daily, log_messages
+
+def last_dates(grid):
+    """[헤더] + 행들 → (전체 기준 마지막 날짜, {닉네임: 본인 마지막 날짜}). 값이 있는 마지막 열을 numpy 로 한 번에 찾음"""
+    if len(grid) < 2: return "-", {}
+    header = [str(h) for h in grid[0]]
+    width = len(header)
+    cells = pd.DataFrame(grid[1:]).reindex(columns=range(width)).fillna('').astype(str).to_numpy(dtype=str)
+    filled = np.char.strip(cells) != ''
+    heads = np.array(header, dtype=object)
+
+    global_date = "-"
+    cols = filled.any(axis=0) & (np.char.strip(np.array(header, dtype=str)) != "닉네임")
+    if cols.any(): global_date = header[width - 1 - int(np.argmax(cols[::-1]))]
+
+    body = filled[:, 1:]
+    if not body.shape[1]: return global_date, {n: "-" for n in np.char.strip(cells[:, 0]).tolist()}
+    has = body.any(axis=1)
+    last = width - 1 - np.argmax(body[:, ::-1], axis=1)
+    dates = np.where(has, heads[last], "-")
+    names = np.char.strip(cells[:, 0])
+    return global_date, dict(zip(names.tolist(), dates.tolist()))
@@ -0,0 +1,151 @@
+import sqlite3
+import threading
+
+from daily_table import DailySlice, to_fans
+
+# --- 설정 ---
+HISTORY_DB_PATH = ".history.sqlite"
+
+class HistoryStore:
+    """2.일간_전체 의 로컬 작업 사본. (닉네임, 날짜, 팬 수) 세로형으로 저장하고,
+    시트의 행/열 순서는 members/dates 테이블의 pos 로 기억함.
+    닉네임/날짜가 비었거나 중복인 시트는 행 위치를 보장할 수 없어서 valid=False 로 두고 시트를 직접 읽게 함.
+    stamp 는 사본이 맞춰진 시점의 스프레드시트 수정 시각 (다른 곳에서 값을 고치면 달라짐)"""
+
+    def __init__(self, path=HISTORY_DB_PATH):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS members (pos INTEGER PRIMARY KEY, nickname TEXT NOT NULL UNIQUE);
+            CREATE TABLE IF NOT EXISTS dates (pos INTEGER PRIMARY KEY, date TEXT NOT NULL UNIQUE);
+            CREATE TABLE IF NOT EXISTS fans (
+                nickname TEXT NOT NULL, date TEXT NOT NULL, fans INTEGER NOT NULL,
+                PRIMARY KEY (nickname, date)) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS fans_by_date ON fans (date, nickname);
+            CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value TEXT);
+        """)
+        self._conn.commit()
+
+    @property
+    def valid(self):
+        row = self._conn.execute("SELECT value FROM state WHERE key = 'valid'").fetchone()
+        return bool(row and row[0] == '1')
+
+    def _set_valid(self, ok):
+        self._conn.execute("INSERT OR REPLACE INTO state VALUES ('valid', ?)", ('1' if ok else '0',))
+
+    def invalidate(self):
+        with self._lock:
+            self._set_valid(False)
+            self._conn.commit()
+
+    @property
+    def stamp(self):
+        row = self._conn.execute("SELECT value FROM state WHERE key = 'stamp'").fetchone()
+        return row[0] if row else None
+
+    def set_stamp(self, stamp):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO state VALUES ('stamp', ?)", (stamp,))
+            self._conn.commit()
+
+    def members(self):
+        return [r[0] for r in self._conn.execute("SELECT nickname FROM members ORDER BY pos")]
+
+    def dates(self):
+        return [r[0] for r in self._conn.execute("SELECT date FROM dates ORDER BY pos")]
+
+    def matches(self, col_a, header, stamp):
+        """시트의 A열/첫 행이 로컬 사본과 같고 (행/열 위치가 그대로), 그 뒤로 아무도 시트를 고치지 않았는지"""
+        if not self.valid or stamp is None or stamp != self.stamp: return False
+        names = [str(v).strip() for v in col_a[1:]]
+        while names and not names[-1]: names.pop()
+        head = [str(h).strip() for h in header]
+        while head and not head[-1]: head.pop()
+        members, dates = self.members(), self.dates()
+        if not members and not dates: return not names and not head
+        return names == members and head == ['닉네임'] + dates
+
+    def daily_slice(self, col_a, header, stamp, today_str):
+        """사본이 시트와 같으면 (matches) 오늘 반영에 필요한 DailySlice, 아니면 None (시트 전체를 읽어야 함)"""
+        if not self.matches(col_a, header, stamp): return None
+        names, dates, col = self.members(), self.dates(), self.column(today_str)
+        header = ['닉네임'] + dates if names or dates else []
+        return DailySlice(header, names, [str(col[n]) if n in col else "" for n in names])
+
+    def load_grid(self, grid, stamp=None):
+        """시트 전체 값으로 다시 채움 (stamp: 읽기 직전의 수정 시각) → 위치를 보장할 수 있으면 True"""
+        header = [str(h).strip() for h in grid[0]] if grid else []
+        dates = header[1:]
+        names = [str(r[0]).strip() if r else '' for r in grid[1:]]
+        ok = (not grid) or (header[0] == '닉네임' and all(dates) and len(set(dates)) == len(dates)
+                            and all(names) and len(set(names)) == len(names))
+        with self._lock:
+            self._conn.execute("DELETE FROM members")
+            self._conn.execute("DELETE FROM dates")
+            self._conn.execute("DELETE FROM fans")
+            if ok and grid:
+                self._conn.executemany("INSERT INTO members VALUES (?, ?)", enumerate(names))
+                self._conn.executemany("INSERT INTO dates VALUES (?, ?)", enumerate(dates))
+                self._conn.executemany("INSERT INTO fans VALUES (?, ?, ?)", (
+                    (name, d, val) for name, row in zip(names, grid[1:])
+                    for d, cell in zip(dates, row[1:]) if (val := to_fans(cell)) is not None))
+            self._set_valid(ok)
+            self._conn.execute("INSERT OR REPLACE INTO state VALUES ('stamp', ?)", (stamp,))
+            self._conn.commit()
+        return ok
+
+    def column(self, date):
+        """date 열 값 {닉네임: 팬 수}"""
+        return dict(self._conn.execute("SELECT nickname, fans FROM fans WHERE date = ?", (date,)))
+
+    def record_column(self, names, date, values):
+        """commit 결과 (행별 닉네임, date 열 값) 만 반영 (나머지 열은 안 건드림)"""
+        if not all(names) or len(set(names)) != len(names):
+            self.invalidate()
+            return
+        with self._lock:
+            known = set(self.members())
+            start = self._conn.execute("SELECT COALESCE(MAX(pos) + 1, 0) FROM members").fetchone()[0]
+            self._conn.executemany("INSERT INTO members VALUES (?, ?)",
+                                   enumerate([n for n in names if n not in known], start))
+            if date not in self.dates():
+                self._conn.execute("INSERT INTO dates VALUES ((SELECT COALESCE(MAX(pos) + 1, 0) FROM dates), ?)", (date,))
+            cells = [(n, to_fans(v)) for n, v in zip(names, values)]
+            self._conn.executemany("INSERT OR REPLACE INTO fans VALUES (?, ?, ?)",
+                                   [(n, date, v) for n, v in cells if v is not None])
+            self._conn.executemany("DELETE FROM fans WHERE nickname = ? AND date = ?",
+                                   [(n, date) for n, v in cells if v is None])
+            self._conn.commit()
+
+    def grid(self):
+        """시트 모양 grid ([헤더] + 행들), 한 번의 조회로 채움. get_all_values 와 같게 셀은 전부 문자열
+        (주간/월간을 통째로 다시 만들 때만 씀)"""
+        members, dates = self.members(), self.dates()
+        if not members and not dates: return []
+        pos = {n: i for i, n in enumerate(members)}
+        col = {d: j for j, d in enumerate(dates, 1)}
+        rows = [[n] + [""] * len(dates) for n in members]
+        for name, d, val in self._conn.execute("SELECT nickname, date, fans FROM fans"):
+            if name in pos and d in col: rows[pos[name]][col[d]] = str(val)
+        return [['닉네임'] + dates] + rows
+
+    def last_dates(self):
+        """멤버별 값이 있는 가장 최근 날짜"""
+        return dict(self._conn.execute("SELECT nickname, MAX(date) FROM fans GROUP BY nickname"))
+
+    def summary_stats(self, today_str):
+        """rollup.summary_stats 와 같은 값을 날짜 인덱스 조회로 → ({닉네임: 현재 팬 수}, {닉네임: 이번달 팬수})"""
+        month_start = today_str[:8] + "01"
+        rows = self._conn.execute("""
+            WITH cur AS (SELECT nickname, MAX(date) AS d FROM fans WHERE date <= ? GROUP BY nickname),
+                 prev AS (SELECT nickname, MAX(date) AS d FROM fans WHERE date < ? GROUP BY nickname),
+                 first AS (SELECT nickname, MIN(date) AS d FROM fans WHERE date >= ? AND date <= ? GROUP BY nickname)
+            SELECT cur.nickname, fc.fans, COALESCE(fp.fans, ff.fans)
+            FROM cur JOIN fans fc ON fc.nickname = cur.nickname AND fc.date = cur.d
+            LEFT JOIN prev ON prev.nickname = cur.nickname
+            LEFT JOIN fans fp ON fp.nickname = prev.nickname AND fp.date = prev.d
+            LEFT JOIN first ON first.nickname = cur.nickname
+            LEFT JOIN fans ff ON ff.nickname = first.nickname AND ff.date = first.d
+        """, (today_str, month_start, month_start, today_str)).fetchall()
+        return ({n: c for n, c, _ in rows}, {n: c - b if b is not None else 0 for n, c, b in rows})
@@ -0,0 +1,105 @@
+import cv2
+import numpy as np
+
+# --- 설정 ---
+PREVIEW_TOP_RATIO = 0.4      # 미리보기는 화면 위 40% 를 잘라낸 목록 부분만 (Vision 에는 전체 화면)
+ROI_FLAT_STD = 4.0           # 밝기 표준편차가 이보다 작은 줄은 빈 배경으로 보고 위/아래에서 잘라냄
+ROI_PAD_PX = 8
+UPSCALE_BELOW_PX = 2000      # 원본 높이가 이보다 작으면 확대 (행 묶기 px 기준이 확대 후 좌표 기준)
+UPSCALE_FACTOR = 2.0
+OCR_ENCODE_EXT = '.jpg'
+OCR_ENCODE_PARAMS = [cv2.IMWRITE_JPEG_QUALITY, 95]
+PREVIEW_WIDTH = 480
+PREVIEW_ENCODE_PARAMS = [cv2.IMWRITE_JPEG_QUALITY, 80]
+
+def decode_image(image_bytes):
+    return cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR)
+
+def find_roi(img):
+    """위/아래 빈 배경 줄만 잘라낸 세로 영역 (top, bottom). 폭은 그대로 둬서 왼쪽 2% 규칙이 그대로 맞음"""
+    h = img.shape[0]
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    busy = np.flatnonzero(gray.std(axis=1) >= ROI_FLAT_STD)
+    if not len(busy): return 0, h
+    return max(0, busy[0] - ROI_PAD_PX), min(h, busy[-1] + 1 + ROI_PAD_PX)
+
+def preview_crop(img):
+    return img[int(img.shape[0] * PREVIEW_TOP_RATIO):]
+
+def upscale_factor(img):
+    return UPSCALE_FACTOR if img.shape[0] < UPSCALE_BELOW_PX else 1.0
+
+def encode_for_ocr(roi, scale):
+    if scale != 1.0: roi = cv2.resize(roi, None, fx=scale, fy=scale, interpolation=cv2.INTER_CUBIC)
+    _, encoded = cv2.imencode(OCR_ENCODE_EXT, roi, OCR_ENCODE_PARAMS)
+    return encoded.tobytes()
+
+def make_thumbnail(img):
+    h, w = img.shape[:2]
+    if w > PREVIEW_WIDTH:
+        img = cv2.resize(img, (PREVIEW_WIDTH, max(1, int(h * PREVIEW_WIDTH / w))), interpolation=cv2.INTER_AREA)
+    _, encoded = cv2.imencode('.jpg', img, PREVIEW_ENCODE_PARAMS)
+    return encoded.tobytes()
+
+# --- 겹치는 스크롤 스크린샷 이어붙이기 ---
+STITCH_PROBE_PX = 96         # 다음 이미지 스크롤 영역에서 떼어 앞 이미지에서 찾는 띠 높이
+STITCH_PROBE_AT = (0.3, 0.45, 0.6, 0.75)   # 띠를 떼 볼 위치 (화면 높이 비율, 고정 영역/빈 배경이면 다음 위치)
+STITCH_MATCH_MIN = 0.97      # 이 이상 일치해야 겹친 것으로 봄
+STITCH_CONTEXT_PX = 360      # 겹친 부분 중 이만큼은 다시 보냄 (앞 이미지 아래 끝에 걸쳐 잘린 행을 온전히 읽도록, 1440 폭 기준 한 행 260px 보다 크게)
+STITCH_STATIC_DIFF = 2.0     # 두 줄의 밝기 차 평균이 이보다 작으면 같은 줄로 봄
+STITCH_PROFILE_W = 64        # 띠 찾기는 줄마다 가로를 이 칸 수로 평균 낸 것끼리 (세로는 원본 그대로), 확인은 원본 줄로
+
+def _gray(img):
+    return cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+
+def _same_rows(a, b):
+    """a, b 의 줄을 차례로 비교해 같은 줄인지 (짧은 쪽 길이만큼)"""
+    n = min(len(a), len(b))
+    return np.abs(a[:n].astype(np.int16) - b[:n]).mean(axis=1) < STITCH_STATIC_DIFF
+
+def _leading(same):
+    return int(np.argmin(same)) if not same.all() else len(same)
+
+def static_bands(gp, gn):
+    """회색조 두 장 → 위/아래로 같은 위치에 그대로 있는 줄 수 (head, foot). 상단 바 / 하단 메뉴"""
+    return _leading(_same_rows(gp, gn)), _leading(_same_rows(gp[::-1], gn[::-1]))
+
+def _scroll_seen(gp, gn):
+    """gn 의 위에서부터 몇 줄까지가 gp 를 아래로 스크롤한 것으로 이미 나왔는지 (확인 안 되면 0).
+    같은 위치에서 달라진 (= 스크롤된) 띠를 gp 에서 찾아 내려간 만큼 맞추고, 줄이 어긋나는 데까지 (gp 의 하단 메뉴 전) 이어 봄.
+    상단 바의 시계처럼 조금씩 바뀌는 고정 영역이 있어도 띠를 스크롤 영역에서 떼므로 잘못 맞추지 않음"""
+    same = _same_rows(gp, gn)
+    sp = sn = None
+    for ratio in STITCH_PROBE_AT:
+        y = int(len(gn) * ratio)
+        probe = gn[y:y + STITCH_PROBE_PX]
+        if len(probe) < STITCH_PROBE_PX or len(gp) < len(probe): break
+        if probe.std() < ROI_FLAT_STD or same[y:y + STITCH_PROBE_PX].mean() > 0.5: continue   # 빈 배경 / 고정 영역
+        if sp is None: sp, sn = _profile(gp), _profile(gn)
+        _, score, _, loc = cv2.minMaxLoc(cv2.matchTemplate(sp, sn[y:y + STITCH_PROBE_PX], cv2.TM_CCOEFF_NORMED))
+        shift = loc[1] - y
+        if score < STITCH_MATCH_MIN or shift <= 0: continue
+        seen = _leading(_same_rows(gn[y:], gp[y + shift:]))
+        if seen >= STITCH_PROBE_PX: return y + seen
+    return 0
+
+def _profile(gray):
+    return cv2.resize(gray, (min(STITCH_PROFILE_W, gray.shape[1]), gray.shape[0]), interpolation=cv2.INTER_AREA)
+
+def find_overlap(prev, nxt):
+    """스크롤 스크린샷 원본 두 장 → nxt 의 위에서부터 몇 줄까지가 prev 에 이미 나온 내용인지 (겹침 없으면 0,
+    스크롤 영역이 전부 나왔으면 nxt 높이)"""
+    band = unseen_band(prev, nxt)
+    return nxt.shape[0] if band is None else band[2]
+
+def unseen_band(prev, img):
+    """img 중 앞 스크린샷 원본 prev 에 아직 안 나온 세로 구간 → (top, bottom, 겹친 줄 수), 전부 나온 것이면 None.
+    prev 와 똑같은 상단 바 / 하단 메뉴는 prev 에서 이미 읽었으므로 빼고, 스크롤로 겹친 줄은 여유분만 남기고 뺌"""
+    h = img.shape[0]
+    if prev.shape[1] != img.shape[1]: return 0, h, 0
+    gp, gn = _gray(prev), _gray(img)
+    head, foot = static_bands(gp, gn)
+    if head >= min(len(gp), len(gn)): return None
+    seen, bottom = _scroll_seen(gp, gn), h - foot
+    if seen >= bottom: return None
+    return max(head, seen - STITCH_CONTEXT_PX if seen else 0), bottom, seen
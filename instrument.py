@@ -0,0 +1,136 @@
+import contextvars
+import json
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+
+# --- 설정 ---
+METRICS_ENABLED = os.environ.get("UMA_METRICS", "1") != "0"   # 0 이면 run/span/count 전부 no-op
+METRICS_JSONL = ".metrics.jsonl"   # 실행마다 한 줄씩 추가 (추이 확인용)
+METRICS_PROM = ".metrics.prom"     # 실행 이름별 마지막 값 (Prometheus textfile collector 형식)
+
+_current = contextvars.ContextVar('uma_metrics_run', default=None)
+_NOOP = nullcontext()
+_latest = {}
+_file_lock = threading.Lock()
+
+class Run:
+    """한 번의 작업(분석 시작 / 시트 반영 / 뷰어 로드)에서 모은 구간 시간과 카운터.
+    스레드 풀 작업도 bind() 로 감싸면 같은 Run 에 쌓임 → 구간 시간은 스레드별 합계"""
+
+    def __init__(self, name):
+        self.name = name
+        self.started = time.time()
+        self.wall = 0.0
+        self.spans = {}              # stage → [초, 횟수]
+        self.counters = Counter()
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def add_span(self, stage, seconds):
+        with self._lock:
+            acc = self.spans.setdefault(stage, [0.0, 0])
+            acc[0] += seconds
+            acc[1] += 1
+
+    def add_count(self, name, n):
+        with self._lock: self.counters[name] += n
+
+    def finish(self):
+        self.wall = time.perf_counter() - self._t0
+
+    def record(self):
+        return {'run': self.name, 'ts': round(self.started, 3), 'wall_s': round(self.wall, 4),
+                'spans': {k: {'s': round(s, 4), 'n': n} for k, (s, n) in self.spans.items()},
+                'counters': dict(self.counters)}
+
+    def table(self):
+        """admin 표시용 행 목록 (오래 걸린 구간부터)"""
+        return [{'구간': k, '시간(s)': round(s, 3), '횟수': n,
+                 '비율(%)': round(100 * s / self.wall, 1) if self.wall else 0.0}
+                for k, (s, n) in sorted(self.spans.items(), key=lambda kv: -kv[1][0])]
+
+class _Span:
+    __slots__ = ('_run', '_stage', '_t0')
+
+    def __init__(self, run_, stage):
+        self._run, self._stage = run_, stage
+
+    def __enter__(self):
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._run.add_span(self._stage, time.perf_counter() - self._t0)
+        return False
+
+def span(stage):
+    """진행 중인 run 이 없으면 공용 nullcontext (비활성 시 비용은 ContextVar 조회 한 번)"""
+    r = _current.get()
+    return _NOOP if r is None else _Span(r, stage)
+
+def count(name, n=1):
+    r = _current.get()
+    if r is not None: r.add_count(name, n)
+
+def bind(fn):
+    """스레드 풀에 넘길 함수에 현재 run 을 묶음 (작업마다 따로 호출할 것)"""
+    if _current.get() is None: return fn
+    ctx = contextvars.copy_context()
+    return lambda *args, **kwargs: ctx.run(fn, *args, **kwargs)
+
+def _prom_label(v):
+    return str(v).replace('\\', '\\\\').replace('"', '\\"')
+
+def _write(record):
+    """파일 기록 실패는 무시 (계측 때문에 본 작업이 실패하면 안 됨)"""
+    with _file_lock:
+        _latest[record['run']] = record
+        try:
+            with open(METRICS_JSONL, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            lines = ["# TYPE uma_run_seconds gauge"]
+            lines += [f'uma_run_seconds{{run="{_prom_label(r)}"}} {rec["wall_s"]}' for r, rec in _latest.items()]
+            lines.append("# TYPE uma_stage_seconds gauge")
+            lines += [f'uma_stage_seconds{{run="{_prom_label(r)}",stage="{_prom_label(k)}"}} {v["s"]}'
+                      for r, rec in _latest.items() for k, v in rec['spans'].items()]
+            lines.append("# TYPE uma_counter gauge")
+            lines += [f'uma_counter{{run="{_prom_label(r)}",name="{_prom_label(k)}"}} {v}'
+                      for r, rec in _latest.items() for k, v in rec['counters'].items()]
+            tmp = METRICS_PROM + ".tmp"
+            with open(tmp, 'w', encoding='utf-8') as f: f.write("\n".join(lines) + "\n")
+            os.replace(tmp, METRICS_PROM)
+        except OSError: pass
+
+def start(name):
+    """with 블록으로 감쌀 수 없는 작업(백그라운드 worker)용. within() 으로 기록하고 finish() 로 마감"""
+    return Run(name) if METRICS_ENABLED else None
+
+def within(rec, fn):
+    """fn 을 rec 에 기록하면서 실행하는 함수로 감쌈 (rec 가 None 이면 fn 그대로)"""
+    if rec is None: return fn
+    def call(*args, **kwargs):
+        token = _current.set(rec)
+        try: return fn(*args, **kwargs)
+        finally: _current.reset(token)
+    return call
+
+def finish(rec, write=True):
+    if rec is None: return
+    rec.finish()
+    if write: _write(rec.record())
+
+@contextmanager
+def run(name, write=True):
+    """with run("analyze") as rec: ... → rec 는 Run (비활성이면 None). 끝나면 JSONL/Prometheus 파일에 기록"""
+    r = start(name)
+    if r is None:
+        yield None
+        return
+    token = _current.set(r)
+    try: yield r
+    finally:
+        _current.reset(token)
+        finish(r, write)
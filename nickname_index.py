@@ -0,0 +1,129 @@
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from functools import lru_cache
+
+import numpy as np
+from rapidfuzz import fuzz, process
+from rapidfuzz.utils import default_process
+
+MEMO_SIZE = 4096
+LATIN1_DROP = {i: None for i in range(128, 256)}
+
+def fuzz_process(text):
+    """thefuzz WRatio 전처리와 동일: Latin-1 영역(128~255) 문자 제거 후 rapidfuzz 기본 전처리"""
+    return default_process(str(text).translate(LATIN1_DROP))
+
+class NicknameIndex:
+    """명단 한 번 로드할 때 만들어 두는 닉네임 인덱스.
+    점수는 thefuzz.process.extractOne 과 같은 WRatio + 기본 전처리라 기존 50/80 기준이 그대로 유지됨"""
+
+    def __init__(self, names):
+        self.names = list(names)
+        self._processed = [fuzz_process(n) for n in self.names]
+        self._memo = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.names)
+
+    def best_matches(self, queries):
+        """queries 전체를 한 번의 cdist 로 채점 → [(최고 후보, 반올림 점수), ...] (명단이 비면 (None, 0))"""
+        if not self.names: return [(None, 0)] * len(queries)
+        found, todo = {}, []
+        with self._lock:
+            for q in dict.fromkeys(queries):
+                if q in self._memo:
+                    self._memo.move_to_end(q)
+                    found[q] = self._memo[q]
+                else: todo.append(q)
+        if todo:
+            scores = process.cdist([fuzz_process(default_process(q)) for q in todo], self._processed,
+                                   scorer=fuzz.WRatio, processor=None, dtype=np.float64, workers=-1)
+            best = np.argmax(scores, axis=1)   # 동점이면 앞쪽 후보 (extractOne 과 동일)
+            for q, i, row in zip(todo, best, scores):
+                found[q] = (self.names[i], int(round(row[i])))
+        with self._lock:
+            for q, res in found.items():
+                self._memo[q] = res
+                self._memo.move_to_end(q)
+            while len(self._memo) > MEMO_SIZE: self._memo.popitem(last=False)
+        return [found[q] for q in queries]
+
+@lru_cache(maxsize=8)
+def _index_for(names):
+    return NicknameIndex(names)
+
+def index_for(names):
+    """같은 명단이면 같은 인덱스 재사용"""
+    return names if isinstance(names, NicknameIndex) else _index_for(tuple(names))
+
+# --- 뷰어 검색용 (부분 문자열 / 초성 / 오타 허용) ---
+CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+CHOSEONG_SET = set(CHOSEONG)
+SEARCH_LIMIT = 10
+FUZZY_CUTOFF = 60
+
+def search_key(text):
+    return re.sub(r'\s+', '', unicodedata.normalize('NFC', str(text))).lower()
+
+def choseong_key(text):
+    """'하기' → 'ㅎㄱ'. 한글 음절이 아니면 그대로"""
+    out = []
+    for ch in search_key(text):
+        code = ord(ch) - 0xAC00
+        out.append(CHOSEONG[code // 588] if 0 <= code < 11172 else ch)
+    return ''.join(out)
+
+def _grams(text):
+    return {text[i:i + 2] for i in range(len(text) - 1)} if len(text) > 1 else set(text)
+
+class NicknameSearch:
+    """load_data 결과 하나당 한 번 만드는 검색 인덱스.
+    2-gram 역색인으로 후보를 좁힌 뒤 확인하므로 명단이 커져도 질의 비용이 거의 일정함"""
+
+    def __init__(self, names):
+        self.names = [str(n) for n in names]
+        self._keys = [search_key(n) for n in self.names]
+        self._cho = [choseong_key(n) for n in self.names]
+        self._postings = ({}, {})
+        for i in range(len(self.names)):
+            for table, key in zip(self._postings, (self._keys[i], self._cho[i])):
+                for g in _grams(key) | set(key): table.setdefault(g, []).append(i)
+        self._fuzzy_keys = [fuzz_process(n) for n in self.names]
+        self._memo = OrderedDict()
+        self._lock = threading.Lock()   # 캐시된 데이터와 함께 모든 뷰어 세션이 공유함
+
+    def _candidates(self, table, query):
+        grams = _grams(query)
+        lists = [table.get(g, ()) for g in grams]
+        if not lists or not all(lists): return []
+        lists.sort(key=len)
+        hit = set(lists[0])
+        for other in lists[1:]: hit.intersection_update(other)
+        return hit
+
+    def search(self, query, limit=SEARCH_LIMIT):
+        """→ 행 번호 목록 (앞부분 일치 > 앞쪽에서 일치 > 짧은 이름 순, 없으면 오타 허용 유사도 순)"""
+        query = search_key(query)
+        if not query: return []
+        with self._lock:
+            if query in self._memo:
+                self._memo.move_to_end(query)
+                return self._memo[query][:limit]
+
+        is_cho = all(ch in CHOSEONG_SET for ch in query)
+        table, keys = (self._postings[1], self._cho) if is_cho else (self._postings[0], self._keys)
+        found = [(keys[i].find(query), len(keys[i]), i) for i in self._candidates(table, query)]
+        result = [i for pos, _, i in sorted(f for f in found if f[0] >= 0)]
+        if not result and not is_cho:
+            scored = process.extract(fuzz_process(query), self._fuzzy_keys, scorer=fuzz.WRatio,
+                                     processor=None, limit=limit, score_cutoff=FUZZY_CUTOFF)
+            result = [i for _, _, i in scored]
+
+        with self._lock:
+            self._memo[query] = result
+            self._memo.move_to_end(query)
+            while len(self._memo) > MEMO_SIZE: self._memo.popitem(last=False)
+        return result[:limit]
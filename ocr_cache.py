@@ -0,0 +1,74 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from types import SimpleNamespace
+
+# --- 설정 ---
+OCR_CACHE_PATH = ".ocr_cache.sqlite"
+OCR_CACHE_MAX_MB = 200       # 응답 JSON 총합 상한
+OCR_CACHE_MAX_AGE_DAYS = 30
+
+def image_key(content):
+    """Vision 으로 보내는 (전처리된) 이미지 바이트의 해시"""
+    return hashlib.sha256(content).hexdigest()
+
+def dump_annotations(texts):
+    return json.dumps([
+        {'d': t.description, 'v': [[v.x, v.y] for v in t.bounding_poly.vertices]} for t in texts
+    ], ensure_ascii=False)
+
+def load_annotations(payload):
+    """저장된 JSON → text_annotations 와 같은 모양 (description, bounding_poly.vertices[].x/y)"""
+    return [
+        SimpleNamespace(description=t['d'], bounding_poly=SimpleNamespace(
+            vertices=[SimpleNamespace(x=x, y=y) for x, y in t['v']]))
+        for t in json.loads(payload)
+    ]
+
+class OcrCache:
+    """Vision text_annotations 원본을 이미지 해시로 저장. 닉네임 보정은 매번 현재 명단으로 다시 돌림"""
+
+    def __init__(self, path=OCR_CACHE_PATH, max_mb=OCR_CACHE_MAX_MB, max_age_days=OCR_CACHE_MAX_AGE_DAYS):
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.max_age = max_age_days * 86400
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS ocr (key TEXT PRIMARY KEY, payload TEXT NOT NULL, "
+            "size INTEGER NOT NULL, created REAL NOT NULL, used REAL NOT NULL)")
+        self._conn.commit()
+        self.evict()
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT payload, created FROM ocr WHERE key = ?", (key,)).fetchone()
+            if row is None: return None
+            if time.time() - row[1] > self.max_age:
+                self._conn.execute("DELETE FROM ocr WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE ocr SET used = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+        return load_annotations(row[0])
+
+    def put(self, key, texts):
+        payload = dump_annotations(texts)
+        now = time.time()
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO ocr VALUES (?, ?, ?, ?, ?)",
+                               (key, payload, len(payload.encode('utf-8')), now, now))
+            self._conn.commit()
+        self.evict()
+
+    def evict(self):
+        """기간 지난 항목 삭제 후, 용량 초과분은 오래 안 쓴 순서로 삭제"""
+        with self._lock:
+            self._conn.execute("DELETE FROM ocr WHERE created < ?", (time.time() - self.max_age,))
+            total, stale = 0, []
+            for key, size in self._conn.execute("SELECT key, size FROM ocr ORDER BY used DESC"):
+                total += size
+                if total > self.max_bytes: stale.append((key,))
+            if stale: self._conn.executemany("DELETE FROM ocr WHERE key = ?", stale)
+            self._conn.commit()
@@ -0,0 +1,109 @@
+import re
+import time
+
+from google.api_core import exceptions as gexc
+from google.cloud import vision
+
+from image_prep import decode_image, encode_for_ocr, find_roi, make_thumbnail, preview_crop, unseen_band, upscale_factor
+from instrument import count, span
+from ocr_cache import image_key
+from nickname_index import index_for
+from ocr_layout import cluster_rows
+
+# --- 설정 ---
+OCR_CONCURRENCY = 4      # 동시에 보내는 Vision 요청 수
+OCR_MAX_RETRIES = 3      # 일시 오류 재시도 횟수
+OCR_BACKOFF_SEC = 0.5    # 재시도 대기 (지수 증가)
+TRANSIENT_ERRORS = (
+    gexc.ServiceUnavailable, gexc.DeadlineExceeded, gexc.InternalServerError,
+    gexc.TooManyRequests, ConnectionError, TimeoutError,
+)
+TRANSIENT_CODES = {4, 8, 13, 14}   # response.error 의 DEADLINE_EXCEEDED, RESOURCE_EXHAUSTED, INTERNAL, UNAVAILABLE
+
+class VisionResponseError(RuntimeError):
+    """호출은 성공했지만 이미지 단위로 실패한 응답 (response.error). 캐시에 넣지 않음"""
+
+    def __init__(self, code, message):
+        super().__init__(f"Vision 오류 {code}: {message}")
+        self.code = code
+
+def make_vision_client(creds):
+    return vision.ImageAnnotatorClient(credentials=creds)
+
+def clean_nickname_simple(text):
+    garbage_words = ['총','최종','획득','로그인','팬','수','팬수','RANK','Rank','pt','PT','서브','리더','멤버']
+    for word in garbage_words: text = text.replace(word, '')
+    text = re.sub(r'\[\s+', '[', text)
+    text = re.sub(r'\s+\]', ']', text)
+    text = re.sub(r'[\(\)\{\}iIl\|1C<>①②③★\-\:0-9\.,]+', '', text)
+    return text.strip()
+
+def match_nicknames(ocr_texts, db_list):
+    """OCR 닉네임들을 명단 인덱스로 한 번에 보정 (태그 떼고 50점 이상이면 명단 이름으로)"""
+    if not db_list: return list(ocr_texts)
+    cleans = [re.sub(r'\[.*?\]', '', t).strip() if t else '' for t in ocr_texts]
+    todo = [c for c in cleans if c]
+    best = dict(zip(todo, index_for(db_list).best_matches(todo)))
+    out = []
+    for text, clean in zip(ocr_texts, cleans):
+        match, score = best.get(clean, (None, 0))
+        out.append(match if clean and score >= 50 else text)
+    return out
+
+def load_image(image_bytes):
+    with span("decode"): return decode_image(image_bytes)
+
+def prepare_image(image_bytes, prev_img=None):
+    """원본 → (Vision 전송용 JPEG, 미리보기 썸네일 JPEG, 전송 이미지 폭).
+    prev_img (바로 앞에 올린 스크롤 스크린샷 원본) 가 있으면 그와 똑같은 상단 바 / 하단 메뉴와 스크롤로 겹친 줄은
+    잘라서 보냄, 새 줄이 없으면 JPEG 는 None. 세션 첫 장은 비교할 앞 이미지가 없어 빈 배경만 잘라냄"""
+    img = load_image(image_bytes)
+    with span("roi"): top, bottom = find_roi(img)
+    with span("thumbnail"): thumb = make_thumbnail(preview_crop(img))
+    if prev_img is not None:
+        with span("stitch"): band = unseen_band(prev_img, img)
+        if band is None: top = bottom
+        else:
+            top, bottom = max(top, band[0]), min(bottom, band[1])
+            count("ocr_overlap_px", band[2])
+    content = None
+    if top < bottom:
+        with span("encode"): content = encode_for_ocr(img[top:bottom], upscale_factor(img))
+    return content, thumb, int(round(img.shape[1] * upscale_factor(img)))
+
+def detect_texts(client, content, retries=OCR_MAX_RETRIES, backoff=OCR_BACKOFF_SEC):
+    """text_detection 호출. 일시 오류는 지수 백오프로 재시도, 그 외 오류는 그대로 raise.
+    text_detection 은 이미지 단위 실패를 raise 하지 않고 response.error 에 담아 돌려주므로 직접 확인"""
+    image = vision.Image(content=content)
+    for attempt in range(retries + 1):
+        count("vision_calls")
+        count("vision_bytes", len(content))
+        try:
+            with span("vision"): response = client.text_detection(image=image)
+            error = getattr(response, 'error', None)
+            if error is not None and error.message: raise VisionResponseError(error.code, error.message)
+            return response.text_annotations
+        except (TRANSIENT_ERRORS + (VisionResponseError,)) as e:
+            if attempt == retries or (isinstance(e, VisionResponseError) and e.code not in TRANSIENT_CODES): raise
+            count("vision_retries")
+            time.sleep(backoff * (2 ** attempt))
+
+def parse_annotations(texts, img_width, member_db):
+    if len(texts) <= 1: return []
+    with span("parse"):
+        rows = [(val, clean_nickname_simple(full)) for val, full in cluster_rows(texts[1:], img_width)]
+        rows = [(val, cleaned) for val, cleaned in rows if cleaned]
+    with span("match"): corrected = match_nicknames([cleaned for _, cleaned in rows], member_db)
+    return [{'닉네임': nick, '팬 수': val} for (val, _), nick in zip(rows, corrected)]
+
+def fetch_texts(content, creds, client=None, cache=None):
+    """전처리된 JPEG 한 장 → text_annotations (캐시에 있으면 Vision 호출 생략). 오류는 그대로 raise"""
+    key = image_key(content) if cache is not None else None
+    texts = cache.get(key) if cache is not None else None
+    if texts is not None:
+        count("ocr_cache_hits")
+        return texts
+    if client is None: client = make_vision_client(creds)
+    texts = detect_texts(client, content)
+    if cache is not None: cache.put(key, texts)
+    return texts
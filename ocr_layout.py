@@ -0,0 +1,58 @@
+import re
+from bisect import bisect_left, bisect_right, insort
+
+# --- 행 묶기 기준 (기존 OCR 처리와 동일) ---
+ANCHOR_DEDUP_PX = 30     # 팬 수 앵커끼리 이 간격 미만이면 같은 행
+ROW_MARGIN_PX = 100      # 앵커 위/아래로 닉네임 조각을 찾는 범위
+LEFT_MARGIN_RATIO = 0.02 # 왼쪽 2% 안쪽 조각(아이콘 등)은 버림
+
+FAN_RE = re.compile(r'(\d{4,})')
+DIGITS_RE = re.compile(r'^\d+$')
+
+def find_fan_anchors(texts):
+    anchors = []
+    for t in texts:
+        raw = t.description.replace(',', '').strip()
+        match = FAN_RE.search(raw)
+        if match:
+            val = int(match.group(1))
+            if val > 10000000000: val = int(str(val)[1:])
+            box = t.bounding_poly.vertices
+            anchors.append({'val': val, 'lx': box[0].x, 'ty': box[0].y, 'by': box[2].y})
+    return anchors
+
+def dedup_anchors(anchors, tol=ANCHOR_DEDUP_PX):
+    """앞에서부터 이미 채택된 앵커와 ty 차이가 tol 미만이면 버림 (정렬된 ty 목록으로 이웃만 확인)"""
+    kept, kept_ty = [], []
+    for a in anchors:
+        i = bisect_right(kept_ty, a['ty'] - tol)
+        if i < len(kept_ty) and kept_ty[i] < a['ty'] + tol: continue
+        insort(kept_ty, a['ty'])
+        kept.append(a)
+    return kept
+
+def index_fragments(texts, img_width):
+    """숫자가 아닌 조각만 중심 y 순으로 정렬 → (cy 목록, 조각 목록)"""
+    frags = []
+    for i, t in enumerate(texts):
+        if DIGITS_RE.search(t.description.replace(',', '')): continue
+        box = t.bounding_poly.vertices
+        cx, cy = (box[0].x + box[1].x)/2, (box[0].y + box[2].y)/2
+        if cx < img_width*LEFT_MARGIN_RATIO: continue
+        frags.append((cy, cx, box[0].x, i, t.description.strip()))
+    frags.sort(key=lambda f: f[0])
+    return [f[0] for f in frags], frags
+
+def cluster_rows(texts, img_width, margin=ROW_MARGIN_PX):
+    """text_annotations[1:] → [(팬 수, 왼쪽→오른쪽으로 이은 닉네임 문자열), ...] (앵커 순서)"""
+    anchors = dedup_anchors(find_fan_anchors(texts))
+    cys, frags = index_fragments(texts, img_width)
+    rows = []
+    for anc in anchors:
+        lo = bisect_right(cys, anc['ty'] - margin)
+        hi = bisect_left(cys, anc['by'] + margin)
+        hit = [f for f in frags[lo:hi] if f[1] < anc['lx']]
+        if not hit: continue
+        hit.sort(key=lambda f: (f[2], f[3]))
+        rows.append((anc['val'], " ".join(f[4] for f in hit)))
+    return rows
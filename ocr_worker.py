@@ -0,0 +1,150 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import instrument
+from nickname_index import index_for
+from ocr_cache import image_key
+from ocr_engine import OCR_CONCURRENCY, fetch_texts, load_image, make_vision_client, parse_annotations, prepare_image
+
+# --- 작업 상태 ---
+PENDING, RUNNING, DONE, FAILED, CANCELLED = "대기", "처리 중", "완료", "실패", "취소"
+ACTIVE = (PENDING, RUNNING)
+
+class OcrJob:
+    def __init__(self, job_id, name, data, prev=None):
+        self.id = job_id
+        self.name = name
+        self.data = data             # 원본 bytes. 다시 쓸 일이 없어지면 (본인 완료 + 다음 작업 완료) 비움
+        self.prev = prev             # 바로 앞에 올린 작업 (겹친 줄 잘라내기 기준)
+        self.next = None
+        self.status = PENDING
+        self.rows = []
+        self.thumb = None
+        self.error = None
+        self.cancel_requested = False
+        self.future = None
+
+class OcrWorker:
+    """세션당 하나 (st.session_state 에 보관): 업로드된 이미지를 백그라운드 스레드 풀에서 한 장씩 OCR.
+    스크립트는 snapshot()/rows() 로 상태만 읽어 가므로 rerun 이 몇 번 일어나도 작업은 그대로 이어짐.
+    rows() 는 완료 순서대로 뒤에만 붙으므로 data_editor 의 행 번호 기준 수정 내용이 밀리지 않음.
+    연속 스크롤 스크린샷은 앞에 올린 이미지와 겹친 줄을 잘라내고 보냄 (앞 이미지가 실패/취소됐으면 통째로).
+    스레드 풀은 작업이 있을 때만 띄우고 남은 작업이 없으면 내림"""
+
+    def __init__(self, creds, max_workers=OCR_CONCURRENCY, cache=None, client=None):
+        self.creds = creds
+        self.cache = cache
+        self.metrics = None          # 마지막으로 끝난 배치의 instrument.Run
+        self.max_workers = max(1, max_workers)
+        self._pool = None
+        self._lock = threading.Lock()
+        self._jobs = {}              # image_key → OcrJob (업로드 순서)
+        self._rows = []              # (job_id, 행) 완료 순서
+        self._client = client        # 없으면 첫 submit 때 creds 로 만듦
+        self._index = None
+        self._rec = None
+
+    def _submit(self, job):
+        if self._rec is None: self._rec = instrument.start("analyze")
+        if self._pool is None: self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="ocr")
+        job.status, job.error, job.cancel_requested = PENDING, None, False
+        job.future = self._pool.submit(instrument.within(self._rec, self._process), job)
+
+    def submit(self, files, member_db):
+        """files: [(파일 이름, bytes)]. 이미 받은 이미지(같은 내용)는 건너뜀 → 새로 추가된 작업 수"""
+        added = 0
+        with self._lock:
+            if self._client is None: self._client = make_vision_client(self.creds)
+            self._index = index_for(member_db) if member_db else None
+            for name, data in files:
+                key = image_key(data)
+                if key in self._jobs: continue
+                prev = next(reversed(self._jobs.values()), None)
+                self._jobs[key] = job = OcrJob(key, name, data, prev)
+                if prev is not None: prev.next = job
+                self._submit(job)
+                added += 1
+        return added
+
+    def _process(self, job):
+        with self._lock:
+            if job.status != PENDING: return
+            job.status = RUNNING
+            client, index, data = self._client, self._index, job.data
+            prev = job.prev
+            prev_data = prev.data if prev is not None and prev.status not in (FAILED, CANCELLED) else None
+        try:
+            # 앞 이미지는 다시 디코딩해서 씀 (작업마다 배열을 들고 있지 않도록)
+            prev_img = load_image(prev_data) if prev_data is not None else None
+            content, thumb, width = prepare_image(data, prev_img)
+            texts = fetch_texts(content, self.creds, client, self.cache) if content is not None else []
+            rows = parse_annotations(texts, width, index)
+            error = None
+        except Exception as e:
+            rows, thumb, error = [], None, str(e) or type(e).__name__
+        with self._lock:
+            if job.cancel_requested: job.status = CANCELLED
+            elif error: job.status, job.error = FAILED, error
+            else:
+                job.status, job.rows, job.thumb = DONE, rows, thumb
+                self._rows.extend((job.id, r) for r in rows)
+                for j in (job.prev, job): self._release(j)
+            self._close_batch()
+
+    @staticmethod
+    def _release(job):
+        """완료된 작업의 원본은 다음 작업도 완료됐으면 비움 (재시도도, 겹침 기준으로 다시 읽을 일도 없음).
+        마지막 작업은 다음에 올릴 이미지의 기준이라 남겨 둠"""
+        if job is not None and job.status == DONE and job.next is not None and job.next.status == DONE: job.data = None
+
+    def _close_batch(self):
+        """남은 작업이 없으면 이번 배치 계측 마감 + 스레드 풀 내림 (lock 안에서 호출)"""
+        if any(j.status in ACTIVE for j in self._jobs.values()): return
+        if self._rec is not None:
+            instrument.finish(self._rec)
+            self.metrics, self._rec = self._rec, None
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+
+    def cancel(self, job_id):
+        """대기 중이면 바로 취소, 처리 중이면 결과를 버림"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status not in ACTIVE: return
+            if job.status == PENDING and job.future.cancel(): job.status = CANCELLED
+            else: job.cancel_requested = True
+            self._close_batch()
+
+    def retry(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job.status in (FAILED, CANCELLED): self._submit(job)
+
+    @property
+    def busy(self):
+        with self._lock: return any(j.status in ACTIVE for j in self._jobs.values())
+
+    def snapshot(self):
+        """화면 표시용 작업 목록 (업로드 순서)"""
+        with self._lock:
+            return [{'id': j.id, '파일': j.name, '상태': j.status, '행 수': len(j.rows), '오류': j.error or ""}
+                    for j in self._jobs.values()]
+
+    def rows(self):
+        with self._lock: return [r for _, r in self._rows]
+
+    def thumbs(self):
+        with self._lock: return [(j.name, j.thumb) for j in self._jobs.values() if j.thumb is not None]
+
+    def clear(self):
+        """대기 작업 취소 후 비움 (처리 중인 작업 결과는 버려짐)"""
+        with self._lock:
+            for job in self._jobs.values():
+                if job.future is not None: job.future.cancel()
+                job.cancel_requested = True
+            self._jobs, self._rows = {}, []
+            if self._rec is not None: instrument.finish(self._rec)
+            self._rec = None
+            if self._pool is not None: self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+
+from daily_table import LAST_DATE_COL
+from sheet_sync import grid_delta, select_columns, upsert_column
+
+SUMMARY_SHEET = "1.메인_요약"
+CURRENT_COL = '현재 팬 수'
+MONTH_COL = '이번달 팬수'
+
+def _names(daily):
+    return [['닉네임']] + [[n] for n in daily.names]
+
+def _today(daily, today_str):
+    return [[today_str]] + [[v] for v in daily.today]
+
+def _trimmed(values):
+    out = [str(v).strip() for v in values]
+    while out and not out[-1]: out.pop()
+    return out
+
+def anchor_delta(title, pick, old, new, today_str, new_grid, outline):
+    """주간/월간처럼 일간에서 기준일 열만 뽑은 시트를 증분 갱신하는 data 목록. old/new 는 일간의 DailySlice,
+    new_grid() 는 통째로 다시 쓸 때만 부르는 새 일간 전체 grid, outline 은 이 시트의 실제 (A열 값들, 헤더).
+    시트가 이전 일간의 pick 결과와 같은 모양일 때 (A열 = 이전 일간 명단, 헤더 = 이전 기준일들) 바뀔 수 있는 건
+    닉네임 열(새 멤버)과 맨 끝 열뿐:
+    - 오늘이 새 기준일이면 끝에 열 하나 추가 / 같은 달 월말 후보가 오늘로 바뀌면 끝 열을 교체
+    - 오늘이 기준일이 아니면 새 멤버 닉네임만
+    그 외 (처음 만들 때, 명단/열 구성이 시트와 어긋난 경우) 는 통째로 다시 씀"""
+    new_cols = pick(new.header[1:])
+    old_cols = pick(old.header[1:]) if old.header else []
+    col_a, head = outline
+    in_sync = _trimmed(col_a[1:]) == old.names and _trimmed(head) == old_cols
+    last = len(new_cols) - 1
+    tail_only = new_cols[:-1] == old_cols or (len(new_cols) == len(old_cols) and new_cols[:-1] == old_cols[:-1])
+    if not in_sync or not old.header or (today_str in new_cols and new_cols[last] != today_str) \
+            or (new_cols != old_cols and not (new_cols[last] == today_str and tail_only)):
+        old_grid = [[""] * len(head) for _ in col_a]   # 시트에 남는 예전 셀만 비우도록 실제 크기만 맞춤
+        return grid_delta(title, old_grid, select_columns(new_grid(), new_cols), force=True)
+
+    data = grid_delta(title, _names(old), _names(new))
+    if last > 0 and new_cols[last] == today_str:
+        # 끝 열이 이미 오늘이면 바뀐 셀만, 다른 날짜를 오늘로 바꾸는 거면 열 전체
+        old_tail = _today(old, today_str) if last < len(old_cols) and old_cols[last] == today_str else []
+        data += grid_delta(title, old_tail, _today(new, today_str), origin=(0, last))
+    return data
+
+def fan_matrix(grid):
+    """[헤더] + 행들 → (닉네임 목록, 날짜 배열, 팬 수 float 행렬 — 빈 칸/숫자 아님은 NaN)"""
+    header = [str(h).strip() for h in grid[0]]
+    cells = pd.DataFrame(grid[1:]).reindex(columns=range(len(header))).fillna('').astype(str)
+    names = cells[0].str.strip().tolist()
+    body = cells.iloc[:, 1:].apply(lambda c: pd.to_numeric(c.str.replace(',', '').str.strip(), errors='coerce'))
+    return names, np.array(header[1:], dtype=object), body.to_numpy(dtype=float)
+
+def _last_valid(values, mask):
+    """행마다 mask 가 True 인 마지막 값 (없으면 NaN)"""
+    if not mask.shape[1]: return np.full(mask.shape[0], np.nan)
+    idx = mask.shape[1] - 1 - np.argmax(mask[:, ::-1], axis=1)
+    return np.where(mask.any(axis=1), values[np.arange(len(values)), idx], np.nan)
+
+def summary_stats(grid, today_str):
+    """멤버별 현재 팬 수 (가장 최근 값) / 이번달 팬수 (현재 - 지난달 마지막 값).
+    지난달 기록이 없는 멤버는 이번 달 첫 값을 기준으로 함. → {닉네임: 값} 두 개"""
+    if len(grid) < 2: return {}, {}
+    names, dates, vals = fan_matrix(grid)
+    valid = ~np.isnan(vals)
+    month_start = today_str[:8] + "01"
+    before = valid & (dates < month_start)
+    this_month = valid & (dates >= month_start) & (dates <= today_str)
+
+    current = _last_valid(vals, valid & (dates <= today_str))
+    first_idx = np.argmax(this_month, axis=1)
+    first = np.where(this_month.any(axis=1), vals[np.arange(len(vals)), first_idx], np.nan)
+    base = np.where(before.any(axis=1), _last_valid(vals, before), first)
+    growth = np.nan_to_num(current - base)
+
+    cur_map, month_map = {}, {}
+    for n, c, g in zip(names, current, growth):
+        if not n or n in cur_map: continue
+        cur_map[n] = int(c) if c == c else 0
+        month_map[n] = int(g)
+    return cur_map, month_map
+
+def summary_grid(summary, names, current, growth, date_map):
+    """요약 시트 값에 현재 팬 수 / 이번달 팬수 / 마지막 집계일 열을 채운 grid.
+    기존 행 순서와 다른 열은 그대로 두고, 일간에서 빠진 멤버 행은 지우고, 요약에 없는 일간 멤버는 끝에 추가"""
+    roster = dict.fromkeys(n for n in names if n)
+    base = [list(summary[0])] if summary else [['닉네임']]
+    base += [list(r) for r in summary[1:] if r and str(r[0]).strip() in roster]
+    known = {str(r[0]).strip() for r in base[1:]}
+    base += [[n] for n in roster if n not in known]
+    base = upsert_column(base, CURRENT_COL, current, default=0)
+    base = upsert_column(base, MONTH_COL, growth, default=0)
+    return upsert_column(base, LAST_DATE_COL, date_map)
@@ -0,0 +1,92 @@
+ROSTER_SHEET = "2.일간_전체"
+HEADER = "닉네임"
+
+def _cell(name):
+    return {'values': [{'userEnteredValue': {'stringValue': name}}]}
+
+def _blocks(rows):
+    """0-based 행 번호들 → 연속 구간 [(start, end), ...] (end 미포함, 아래쪽부터)"""
+    blocks = []
+    for r in sorted(rows):
+        if blocks and blocks[-1][1] == r: blocks[-1][1] = r + 1
+        else: blocks.append([r, r + 1])
+    return [tuple(b) for b in reversed(blocks)]
+
+def plan_changes(snapshot, ops):
+    """A열 스냅샷 하나로 큐에 쌓인 작업을 순서대로 검증.
+    ops: [('add', 이름) | ('rename', 기존, 새이름) | ('delete', 이름), ...]
+    → (결과 리포트, 최종 명단, 추가될 이름들, 삭제될 0-based 행들, 행별 최종 이름)"""
+    rows = list(snapshot)          # 행별 현재 이름 (삭제되면 None)
+    appended = []
+    removed = {}                   # 이번 큐에서 지운 이름 → 원래 행 (다시 추가하면 그 행을 살려 기록 유지)
+    report = []
+
+    def exists(name): return name in rows or name in appended
+
+    for op in ops:
+        kind, name = op[0], op[1].strip()
+        if kind == 'add':
+            if not name: ok, msg = False, "빈 닉네임"
+            elif exists(name): ok, msg = False, "이미 존재하는 닉네임"
+            elif name in removed:
+                for i in removed.pop(name): rows[i] = name
+                ok, msg = True, "추가 (삭제 취소)"
+            else:
+                appended.append(name)
+                ok, msg = True, "추가"
+            report.append({'작업': '추가', '닉네임': name, '결과': ok, '메시지': msg})
+        elif kind == 'rename':
+            new = op[2].strip()
+            label = f"{name} → {new}"
+            if not new: ok, msg = False, "빈 닉네임"
+            elif exists(new): ok, msg = False, "이미 존재하는 닉네임"
+            elif name in rows:
+                rows[rows.index(name)] = new
+                ok, msg = True, "변경 성공"
+            elif name in appended:
+                appended[appended.index(name)] = new
+                ok, msg = True, "변경 성공"
+            else: ok, msg = False, "대상 없음"
+            report.append({'작업': '변경', '닉네임': label, '결과': ok, '메시지': msg})
+        elif kind == 'delete':
+            hit = [i for i, v in enumerate(rows) if v == name]
+            for i in hit: rows[i] = None
+            if hit: removed.setdefault(name, []).extend(hit)
+            if name in appended:
+                appended = [v for v in appended if v != name]
+                hit.append(None)
+            ok, msg = (True, "삭제") if hit else (False, "대상 없음")
+            report.append({'작업': '삭제', '닉네임': name, '결과': ok, '메시지': msg})
+
+    deleted = [i for i, v in enumerate(rows) if v is None]
+    final = [v for v in rows if v is not None] + appended
+    return report, final, appended, deleted, rows
+
+def build_requests(sheet_id, snapshot, rows, appended, deleted):
+    """이름 변경 → 추가 → 삭제(아래 구간부터) 순서의 batchUpdate 요청 목록"""
+    requests = []
+    for i, (old, new) in enumerate(zip(snapshot, rows)):
+        if new is not None and new != old:
+            requests.append({'updateCells': {
+                'rows': [_cell(new)], 'fields': 'userEnteredValue',
+                'start': {'sheetId': sheet_id, 'rowIndex': i, 'columnIndex': 0}}})
+    if appended:
+        requests.append({'appendCells': {
+            'sheetId': sheet_id, 'rows': [_cell(n) for n in appended], 'fields': 'userEnteredValue'}})
+    for start, end in _blocks(deleted):
+        requests.append({'deleteDimension': {'range': {
+            'sheetId': sheet_id, 'dimension': 'ROWS', 'startIndex': start, 'endIndex': end}}})
+    return requests
+
+def apply_roster_changes(session, ops):
+    """A열 1회 읽기 + batchUpdate 1회. → (리포트, 반영 후 명단).
+    시트가 없으면 추가가 있을 때만 새로 만들고 (머리글 행부터), 아니면 빈 명단 기준으로 리포트만 돌려줌"""
+    if not session.has_worksheet(ROSTER_SHEET) and not any(op[0] == 'add' for op in ops):
+        return plan_changes([], ops)[0], []
+    ws = session.worksheet(ROSTER_SHEET, create=True)
+    snapshot = [str(x).strip() for x in ws.col_values(1)]
+    report, final, appended, deleted, rows = plan_changes(snapshot, ops)
+    if not snapshot and appended: appended = [HEADER] + appended
+    requests = build_requests(ws.id, snapshot, rows, appended, deleted)
+    if requests: session.spreadsheet().batch_update({'requests': requests})
+    return report, [n for n in final if n and n != HEADER]
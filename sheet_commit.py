@@ -0,0 +1,104 @@
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+
+from daily_table import DailySlice, apply_slice, slice_of, upsert_daily, last_dates
+from instrument import span
+from nickname_index import index_for
+from rollup import SUMMARY_SHEET, anchor_delta, summary_grid, summary_stats
+from sheet_session import last_modified, version_stamp_data, META_SHEET
+from sheet_sync import grid_delta, read_outlines, select_columns, weekly_columns, monthly_columns
+
+KST = timezone(timedelta(hours=9))
+DAILY_SHEET = "2.일간_전체"
+ROLLUPS = [("3.주간_기록", weekly_columns), ("4.월간_누적", monthly_columns)]
+
+def _daily_delta(old, new, today_str):
+    """일간 시트에서 반영 한 번에 바뀔 수 있는 A열(새 행)과 오늘 열만 비교"""
+    data = grid_delta(DAILY_SHEET, [old.header[:1]] + [[n] for n in old.names], [new.header[:1]] + [[n] for n in new.names])
+    old_col = [[today_str if today_str in old.header else ""]] + [[v] for v in old.today]
+    new_col = [[today_str]] + [[v] for v in new.today]
+    return data + grid_delta(DAILY_SHEET, old_col, new_col, origin=(0, new.header.index(today_str)))
+
+def commit_daily(session, store, confirmed_df, now=None):
+    """확정된 OCR 결과를 일간/주간/월간/요약 시트에 반영 → 로그 목록
+    session: SheetSession (또는 같은 메서드를 가진 가짜), store: HistoryStore"""
+    # 편집 표에서 행을 추가/삭제하면 팬 수 열이 float 가 됨 → 시트/로컬 사본에는 정수로
+    confirmed_df = confirmed_df.assign(**{'팬 수': pd.to_numeric(confirmed_df['팬 수']).round().astype('int64')})
+    sh = session.spreadsheet()
+    rollup_names = [name for name, _ in ROLLUPS]
+    with span("sheet_open"):
+        for name in [SUMMARY_SHEET, DAILY_SHEET] + rollup_names: session.worksheet(name, create=True)
+    now = now or datetime.now(KST)
+    today_str = now.strftime("%Y-%m-%d")
+    # 일간/주간/월간 A열·헤더 + 요약 전체를 한 번에. 일간 구조가 같고 그 뒤로 스프레드시트가 안 바뀌었으면 로컬 사본 사용,
+    # 아니면 일간/주간/월간 전체를 한 번 더 읽어서 로컬 사본을 다시 채우고 주간/월간도 실제 내용과 비교
+    with span("sheet_read"):
+        stamp = last_modified(sh)
+        outlines, grids = read_outlines(sh, [DAILY_SHEET] + rollup_names, [SUMMARY_SHEET])
+        old = store.daily_slice(*outlines[DAILY_SHEET], stamp, today_str)
+        full = None
+        if old is None:
+            grids.update(read_outlines(sh, [], [DAILY_SHEET] + rollup_names)[1])
+            full = grids[DAILY_SHEET]
+            store.load_grid(full, stamp)
+            old = slice_of(full, today_str)
+    log_messages = []
+
+    if not old.header:
+        new = DailySlice(['닉네임', today_str], [str(n).strip() for n in confirmed_df['닉네임']], confirmed_df['팬 수'].tolist())
+        for _, row in confirmed_df.iterrows():
+            log_messages.append(f"🆕 **{row['닉네임']}**: 신규 생성 -> {row['팬 수']:,}")
+    else:
+        header = list(old.header)
+        if '닉네임' not in header: header[0] = '닉네임'
+        if today_str not in header: header.append(today_str)
+        # 닉네임 + 오늘 열만으로 반영 (지난 날짜 열은 바뀌지 않음)
+        df_daily = pd.DataFrame({today_str: old.today}, index=pd.Index(old.names, name='닉네임'), dtype=object)
+        with span("upsert"):
+            df_daily, log_messages = upsert_daily(df_daily, confirmed_df, today_str, index_for(old.names))
+        new = DailySlice(header, df_daily.index.tolist(), df_daily[today_str].tolist())
+
+    # 바뀐 셀 / 새 날짜 열 / 신규 행만 한 번의 values_batch_update 로 전송
+    with span("delta"): data = _daily_delta(old, new, today_str)
+
+    # 로컬 사본에는 오늘 열/신규 멤버만 반영
+    if store.valid:
+        with span("history_store"): store.record_column(new.names, today_str, new.today)
+
+    built = []
+    def new_grid():
+        # 새 일간 전체 grid 는 필요할 때 한 번만 (시트를 읽었으면 그 값에, 아니면 로컬 사본에서)
+        if not built: built.append(apply_slice(full, new, today_str) if full is not None else store.grid())
+        return built[0]
+
+    # 주간/월간: 시트 전체를 읽었으면 실제 내용과 비교 (행 삭제/이름 변경/손으로 고친 값 반영),
+    # 아니면 기준일 열만 증분 갱신 (새 기준일이면 끝에 열 하나 추가, 아니면 새 멤버 닉네임만)
+    with span("rollup"):
+        for name, pick in ROLLUPS:
+            if full is not None: data += grid_delta(name, grids[name], select_columns(new_grid(), pick(new.header[1:])))
+            else: data += anchor_delta(name, pick, old, new, today_str, new_grid, outlines[name])
+
+    # 요약 시트: 현재 팬 수 / 이번달 팬수 / 마지막 집계일 (뷰어는 이 시트만 읽음)
+    with span("summary"):
+        if store.valid: (current, growth), date_map = store.summary_stats(today_str), store.last_dates()
+        else:
+            grid = new_grid()
+            (current, growth), date_map = summary_stats(grid, today_str), last_dates(grid)[1]
+        summary = grids[SUMMARY_SHEET]
+        new_summary = summary_grid(summary, new.names, current, growth, date_map)
+        data += grid_delta(SUMMARY_SHEET, summary, new_summary)
+
+    # 뷰어 캐시 무효화용 버전 스탬프
+    session.worksheet(META_SHEET, create=True, rows=1, cols=2)
+    data += version_stamp_data(now.strftime("%Y-%m-%dT%H:%M:%S.%f"), today_str)
+
+    try:
+        with span("sheet_write"):
+            if data: sh.values_batch_update({'valueInputOption': 'RAW', 'data': data})
+    except Exception:
+        store.invalidate()   # 시트에 못 썼으면 로컬 사본도 믿을 수 없음 → 다음엔 시트에서 다시 읽음
+        raise
+    # 방금 쓴 상태의 수정 시각을 기억 → 다음 반영 전까지 누가 시트를 고치면 달라져서 전체를 다시 읽음
+    if store.valid: store.set_stamp(last_modified(sh))
+    return log_messages
@@ -0,0 +1,107 @@
+import os
+import threading
+from datetime import datetime, timedelta
+
+import gspread
+from gspread.utils import absolute_range_name
+import streamlit as st
+from google.auth.transport.requests import Request
+from google.oauth2 import service_account
+
+from instrument import count
+
+SCOPES = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
+TOKEN_REFRESH_MARGIN = timedelta(minutes=5)   # 만료 이 시간 전이면 미리 갱신
+META_SHEET = "0.메타"   # A1: 데이터 버전 스탬프 (admin 반영 때마다 갱신)
+
+# --- [핵심] 인증 처리 함수 (클라우드/로컬 자동 감지) ---
+def get_credentials():
+    # 1. Streamlit Cloud 비밀 금고에 있는지 확인
+    if "gcp_service_account" in st.secrets:
+        return service_account.Credentials.from_service_account_info(
+            st.secrets["gcp_service_account"]
+        )
+    # 2. 로컬 파일(secret.json)이 있는지 확인 (테스트용)
+    elif os.path.exists("secret.json"):
+        return service_account.Credentials.from_service_account_file("secret.json")
+    else:
+        return None
+
+def _session_of(gc):
+    # gspread 6: gc.http_client.session / gspread 5: gc.session
+    return getattr(gc, 'http_client', gc).session
+
+class SheetSession:
+    """프로세스당 하나: 인증된 client, 열린 Spreadsheet, 워크시트 핸들을 재사용"""
+
+    def __init__(self, sheet_url, creds):
+        self.sheet_url = sheet_url
+        self.creds = creds.with_scopes(SCOPES)
+        self.api_calls = 0
+        self._lock = threading.RLock()          # client/Spreadsheet/워크시트 핸들 (뷰어 스레드, 서클 fetch 풀이 공유)
+        self._count_lock = threading.Lock()     # 응답 hook 은 _lock 을 잡은 채 나가는 요청에서도 불림
+        self._gc = None
+        self._sh = None
+        self._ws = {}
+
+    def _count(self, resp, *args, **kwargs):
+        with self._count_lock: self.api_calls += 1
+        body = resp.request.body
+        count("sheets_api_calls")
+        count("sheets_bytes_sent", len(body) if body else 0)
+        try: st.session_state['sheet_api_calls'] = st.session_state.get('sheet_api_calls', 0) + 1
+        except Exception: pass
+        return resp
+
+    def _ensure_fresh(self):
+        expiry = self.creds.expiry
+        if not self.creds.valid or (expiry and expiry - datetime.utcnow() < TOKEN_REFRESH_MARGIN):
+            self.creds.refresh(Request())
+
+    def spreadsheet(self):
+        with self._lock:
+            if self._gc is None:
+                self._gc = gspread.authorize(self.creds)
+                _session_of(self._gc).hooks['response'].append(self._count)
+            self._ensure_fresh()
+            if self._sh is None:
+                self._sh = self._gc.open_by_url(self.sheet_url)
+            return self._sh
+
+    def _load_worksheets(self, name):
+        """name 이 캐시에 없으면 목록을 한 번 다시 읽음 (다른 앱이 새로 만든 시트 반영). _lock 안에서 호출"""
+        sh = self.spreadsheet()
+        if name not in self._ws: self._ws = {ws.title: ws for ws in sh.worksheets()}
+        return sh
+
+    def has_worksheet(self, name):
+        with self._lock:
+            self._load_worksheets(name)
+            return name in self._ws
+
+    def worksheet(self, name, create=False, rows=100, cols=20):
+        """캐시된 핸들 반환. 없으면 create=True 일 때만 새로 만듦 (아니면 WorksheetNotFound)"""
+        with self._lock:
+            sh = self._load_worksheets(name)
+            if name not in self._ws:
+                if not create: raise gspread.WorksheetNotFound(name)
+                self._ws[name] = sh.add_worksheet(name, rows, cols)
+            return self._ws[name]
+
+@st.cache_resource
+def get_sheet_session(sheet_url, _creds):
+    return SheetSession(sheet_url, _creds)
+
+def read_version(session):
+    """뷰어용: 셀 하나만 읽는 가벼운 버전 확인. 메타 시트가 없으면 None"""
+    try: return session.worksheet(META_SHEET).acell('A1').value
+    except gspread.WorksheetNotFound: return None
+
+def last_modified(sh):
+    """스프레드시트 마지막 수정 시각 (Drive 메타데이터, 셀 값 하나만 고쳐도 바뀜). 못 읽으면 None"""
+    try: return sh.get_lastUpdateTime()
+    except Exception: return None
+
+def version_stamp_data(stamp, note=""):
+    """values_batch_update 에 같이 실어 보낼 버전 스탬프"""
+    return [{'range': absolute_range_name(META_SHEET, 'A1'), 'values': [[stamp, note]]}]
@@ -0,0 +1,97 @@
+from gspread.utils import absolute_range_name, rowcol_to_a1
+
+WEEKLY_DAYS = ['01', '08', '15', '22', '29']
+
+def weekly_columns(cols):
+    weekly_cols = ['닉네임']
+    for col in cols:
+        if col != '닉네임' and col.split('-')[2] in WEEKLY_DAYS: weekly_cols.append(col)
+    return weekly_cols
+
+def monthly_columns(cols):
+    month_map = {}
+    for col in cols:
+        if col != '닉네임':
+            m_prefix = col[:7]
+            if m_prefix not in month_map or col > month_map[m_prefix]: month_map[m_prefix] = col
+    return ['닉네임'] + sorted(list(month_map.values()))
+
+def read_outlines(sh, titles, full_titles=()):
+    """titles 는 A열/첫 행만, full_titles 는 시트 전체를 values_batch_get 한 번으로 읽음
+    → ({제목: (A열 값들, 헤더)}, {제목: grid})"""
+    ranges = [absolute_range_name(t, r) for t in titles for r in ('A:A', '1:1')]
+    ranges += [absolute_range_name(t) for t in full_titles]
+    got = [vr.get('values', []) for vr in sh.values_batch_get(ranges)['valueRanges']]
+    outlines = {t: ([r[0] if r else '' for r in got[2 * i]], got[2 * i + 1][0] if got[2 * i + 1] else [])
+                for i, t in enumerate(titles)}
+    return outlines, dict(zip(full_titles, got[2 * len(titles):]))
+
+def select_columns(grid, cols):
+    """[헤더] + 행들 에서 cols 순서대로 열만 뽑은 grid (없는 열은 무시)"""
+    if not grid: return []
+    header = grid[0]
+    idx = [header.index(c) for c in cols if c in header]
+    return [[row[i] if i < len(row) else "" for i in idx] for row in grid]
+
+def upsert_column(grid, col_name, values_by_key, default="-"):
+    """첫 열(닉네임) 기준으로 col_name 열을 채운 새 grid. 열이 없으면 맨 뒤에 추가"""
+    header = list(grid[0])
+    if col_name not in header: header.append(col_name)
+    ci = header.index(col_name)
+    out = [header]
+    for row in grid[1:]:
+        row = list(row) + [""] * (len(header) - len(row))
+        row[ci] = values_by_key.get(str(row[0]).strip(), default)
+        out.append(row)
+    return out
+
+def _cell(v):
+    if hasattr(v, 'item'): v = v.item()   # numpy 스칼라 → JSON 가능 타입
+    if v is None or v != v: return ""     # None / NaN
+    return v
+
+def _same(a, b):
+    # 시트 표시값 "12,345" 와 숫자 12345 는 같은 값
+    return str(_cell(a)).replace(',', '').strip() == str(_cell(b)).replace(',', '').strip()
+
+def _get(grid, r, c):
+    return grid[r][c] if r < len(grid) and c < len(grid[r]) else ""
+
+def grid_delta(title, old_grid, new_grid, force=False, origin=(0, 0)):
+    """old_grid(시트에 있는 값) → new_grid 로 만드는 values_batch_update 용 data 목록.
+    - 기존 행 범위: 바뀐 셀만, 열마다 연속 구간 하나씩 (오늘 날짜 열이 한 range 로 나감)
+    - 새로 늘어난 행: 한 덩어리 range
+    - new_grid 밖으로 남는 old 셀: 빈 값으로 덮음
+    force=True 면 new_grid 전체를 A1 부터 한 번에 씀 (열 구성이 바뀐 시트용)
+    origin=(행, 열) 을 주면 grid 의 [0][0] 을 시트의 그 위치(0-based)로 보고 범위를 만듦"""
+    data = []
+    new_h = len(new_grid)
+    new_w = max((len(r) for r in new_grid), default=0)
+    old_h = len(old_grid)
+    old_w = max((len(r) for r in old_grid), default=0)
+
+    def add(r0, c0, block):
+        a1 = rowcol_to_a1(origin[0] + r0 + 1, origin[1] + c0 + 1)
+        data.append({'range': absolute_range_name(title, a1), 'values': block})
+
+    if force:
+        if new_h: add(0, 0, [[_cell(_get(new_grid, r, c)) for c in range(new_w)] for r in range(new_h)])
+    else:
+        body_h = min(old_h, new_h)
+        for c in range(new_w):
+            run_start = None
+            for r in range(body_h + 1):
+                changed = r < body_h and not _same(_get(old_grid, r, c), _get(new_grid, r, c))
+                if changed and run_start is None: run_start = r
+                elif not changed and run_start is not None:
+                    add(run_start, c, [[_cell(_get(new_grid, i, c))] for i in range(run_start, r)])
+                    run_start = None
+        if new_h > old_h:
+            add(old_h, 0, [[_cell(_get(new_grid, r, c)) for c in range(new_w)] for r in range(old_h, new_h)])
+
+    # 새 grid 밖으로 남는 예전 셀 비우기
+    if old_w > new_w and min(old_h, new_h):
+        add(0, new_w, [[""] * (old_w - new_w) for _ in range(min(old_h, new_h))])
+    if old_h > new_h:
+        add(new_h, 0, [[""] * old_w for _ in range(old_h - new_h)])
+    return data
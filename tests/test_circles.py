@@ -0,0 +1,27 @@
+import circles
+from circles import CircleFeed, fetch_all
+from fakes import FakeSession, FakeSpreadsheet
+from viewer_data import fetch_data
+
+def make_session():
+    sh = FakeSpreadsheet()
+    sh.seed("0.메타", [["v1"]])
+    sh.seed("1.메인_요약", [['닉네임', '현재 팬 수', '이번달 팬수'], ['가나', '100', '10']])
+    return FakeSession(sh)
+
+def test_poll_error_serves_cached_frame(monkeypatch):
+    monkeypatch.setattr(circles, 'VERSION_POLL_SEC', 0)
+    session, feed = make_session(), CircleFeed(fetch_data)
+    first = fetch_all({'a': (feed, session)})['a']
+    assert first[0]['닉네임'].tolist() == ['가나']
+
+    def broken(label): raise ConnectionError("sheets down")
+    monkeypatch.setattr(session.worksheet("0.메타"), 'acell', broken)
+    again = fetch_all({'a': (feed, session)})['a']
+    assert again is first
+
+def test_poll_error_without_cache_is_reported():
+    session, feed = make_session(), CircleFeed(fetch_data)
+    def broken(label): raise ConnectionError("sheets down")
+    session.worksheet("0.메타").acell = broken
+    assert isinstance(fetch_all({'a': (feed, session)})['a'], ConnectionError)
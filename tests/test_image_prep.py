@@ -0,0 +1,34 @@
+import numpy as np
+
+from image_prep import PREVIEW_TOP_RATIO, ROI_PAD_PX, STITCH_CONTEXT_PX, find_overlap, find_roi, unseen_band
+
+def textured(h, w=1080, seed=0):
+    return np.random.default_rng(seed).integers(0, 255, (h, w, 3), dtype=np.uint8)
+
+def test_find_roi_keeps_rows_in_top_of_frame():
+    img = np.full((2400, 1080, 3), 30, np.uint8)
+    img[100:1800] = textured(1700)
+    top, bottom = find_roi(img)
+    assert top == 100 - ROI_PAD_PX < int(2400 * PREVIEW_TOP_RATIO)   # 목록이 화면 위쪽부터 시작해도 잘리지 않음
+    assert bottom == 1800 + ROI_PAD_PX
+
+def screen(page, top, header, footer, h=2400):
+    return np.vstack([header, page[top + len(header):top + h - len(footer)], footer])
+
+def test_overlap_skips_static_header_and_footer():
+    page, header, footer = textured(6000, seed=1), textured(200, seed=2), textured(150, seed=3)
+    prev, nxt = screen(page, 0, header, footer), screen(page, 700, header, footer)
+    # prev 스크롤 영역 끝(page 2250) 까지가 nxt 의 2250-700 줄까지 나옴
+    assert find_overlap(prev, nxt) == 2250 - 700
+    assert unseen_band(prev, nxt) == (2250 - 700 - STITCH_CONTEXT_PX, 2250, 2250 - 700)
+    assert find_overlap(prev, prev.copy()) == 2400
+    assert find_overlap(prev, screen(page, 3000, header, footer)) == 0
+    # 이어지지 않는 화면이어도 똑같은 상단 바 / 하단 메뉴는 이미 읽었으므로 뺌
+    assert unseen_band(prev, screen(page, 3000, header, footer)) == (200, 2250, 0)
+
+def test_overlap_ignores_changing_status_bar():
+    page, header, footer = textured(6000, seed=1), textured(200, seed=2), textured(150, seed=3)
+    prev, nxt = screen(page, 0, header, footer), screen(page, 700, header, footer)
+    nxt[:40] = textured(40, seed=4)            # 시계가 바뀐 상단 바: 상단 띠가 제자리(0)에 맞아 전부 본 것으로 치면 안 됨
+    assert find_overlap(prev, nxt) == 2250 - 700
+    assert unseen_band(prev, nxt) == (2250 - 700 - STITCH_CONTEXT_PX, 2250, 2250 - 700)
@@ -0,0 +1,53 @@
+import random
+
+import pytest
+
+from nickname_index import NicknameIndex, NicknameSearch
+
+@pytest.mark.parametrize("roster, query, expected", [
+    (['Alice', 'Bob'], 'Ace', ('Alice', 75)),      # 오인식 문자 제거로 100 이 되면 안 됨
+    (['Kim77', 'Lee'], 'Kim', ('Kim77', 90)),
+    (['Cloud', 'Rain'], 'loud', ('Cloud', 89)),
+])
+def test_scores_are_plain_wratio(roster, query, expected):
+    assert NicknameIndex(roster).best_matches([query]) == [expected]
+
+def test_matches_thefuzz_extract_one():
+    thefuzz = pytest.importorskip("thefuzz.process")
+    rng = random.Random(7)
+    alphabet = "abcdeiIl1C0 가나다라하기"
+    roster = ["".join(rng.choice(alphabet) for _ in range(rng.randint(2, 8))) for _ in range(60)]
+    queries = ["".join(rng.choice(alphabet) for _ in range(rng.randint(1, 8))) for _ in range(500)]
+    got = NicknameIndex(roster).best_matches(queries)
+    for q, (name, score) in zip(queries, got):
+        want = thefuzz.extractOne(q, roster)
+        if want is None: continue
+        assert score == want[1], q
+        assert name == want[0], q
+
+def found(search, query, **kw):
+    return [search.names[i] for i in search.search(query, **kw)]
+
+def test_search_choseong():
+    search = NicknameSearch(['하기', '하늘', '고양이', '한국', '호가호위'])
+    assert found(search, 'ㅎㄱ') == ['하기', '한국', '호가호위']
+    assert found(search, 'ㅋㅋ') == []                 # 초성 질의는 오타 허용으로 넘어가지 않음
+
+def test_search_prefix_first_then_position_then_length():
+    search = NicknameSearch(['나하기', '하기나다', 'xx하기', '하기', 'Ha Gi'])
+    assert found(search, '하기') == ['하기', '하기나다', '나하기', 'xx하기']
+    assert found(search, ' hag I') == ['Ha Gi']         # 공백 / 대소문자 무시
+
+def test_search_fuzzy_fallback():
+    search = NicknameSearch(['Alexander', 'Bob', '가나다라'])
+    assert found(search, 'Alxeander') == ['Alexander']
+    assert found(search, 'zzzz') == []
+
+def test_search_memo_reuse(monkeypatch):
+    search = NicknameSearch([f'하기{i}' for i in range(30)])
+    first = search.search('하기', limit=20)
+    calls = []
+    monkeypatch.setattr(search, '_candidates', lambda *a: calls.append(a) or [])
+    assert search.search('하 기', limit=20) == first    # 같은 검색 키는 다시 계산하지 않음
+    assert search.search('하기', limit=5) == first[:5]
+    assert calls == []
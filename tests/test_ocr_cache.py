@@ -0,0 +1,68 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from fakes import make_annotations
+from ocr_cache import OcrCache, dump_annotations, image_key
+from ocr_engine import VisionResponseError, fetch_texts
+
+TEXTS = make_annotations(['가나다', '라마바'], [1234567, 7654321])
+
+def make_cache(tmp_path, **kwargs):
+    return OcrCache(str(tmp_path / "ocr.sqlite"), **kwargs)
+
+def test_put_get_roundtrip(tmp_path):
+    cache = make_cache(tmp_path)
+    assert cache.get("missing") is None
+    cache.put("k", TEXTS)
+    got = cache.get("k")
+    assert dump_annotations(got) == dump_annotations(TEXTS)
+    assert make_cache(tmp_path).get("k") is not None          # 재시작해도 남음
+
+def test_expired_entry_is_dropped(tmp_path, monkeypatch):
+    cache = make_cache(tmp_path, max_age_days=1)
+    cache.put("k", TEXTS)
+    later = time.time() + 2 * 86400
+    monkeypatch.setattr(time, 'time', lambda: later)
+    assert cache.get("k") is None
+    assert cache._conn.execute("SELECT COUNT(*) FROM ocr").fetchone()[0] == 0
+
+def test_size_limit_evicts_least_recently_used(tmp_path, monkeypatch):
+    size = len(dump_annotations(TEXTS).encode('utf-8'))
+    cache = make_cache(tmp_path, max_mb=2.5 * size / 2**20)    # 두 개까지만
+    clock = iter(range(10**9, 10**9 + 100))
+    monkeypatch.setattr(time, 'time', lambda: next(clock))
+    cache.put("a", TEXTS)
+    cache.put("b", TEXTS)
+    assert cache.get("a") is not None                          # a 를 최근에 씀 → b 가 가장 오래 안 씀
+    cache.put("c", TEXTS)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+
+class ErrorClient:
+    """처음 n 번은 response.error 를 담아 돌려주는 Vision 대용"""
+
+    def __init__(self, code, n):
+        self.code, self.n, self.calls = code, n, 0
+
+    def text_detection(self, image):
+        self.calls += 1
+        if self.calls <= self.n:
+            return SimpleNamespace(text_annotations=[], error=SimpleNamespace(code=self.code, message="bad image"))
+        return SimpleNamespace(text_annotations=TEXTS, error=SimpleNamespace(code=0, message=""))
+
+def test_error_response_raises_and_is_not_cached(tmp_path):
+    cache = make_cache(tmp_path)
+    client = ErrorClient(code=3, n=1)                          # INVALID_ARGUMENT: 재시도 안 함
+    with pytest.raises(VisionResponseError):
+        fetch_texts(b"jpeg", None, client, cache)
+    assert client.calls == 1 and cache.get(image_key(b"jpeg")) is None
+    assert len(fetch_texts(b"jpeg", None, client, cache)) == len(TEXTS)   # 다시 올리면 Vision 을 다시 부름
+    assert client.calls == 2 and cache.get(image_key(b"jpeg")) is not None
+
+def test_transient_error_response_is_retried(tmp_path, monkeypatch):
+    monkeypatch.setattr(time, 'sleep', lambda s: None)
+    client = ErrorClient(code=14, n=2)                         # UNAVAILABLE
+    assert len(fetch_texts(b"jpeg", None, client, make_cache(tmp_path))) == len(TEXTS)
+    assert client.calls == 3
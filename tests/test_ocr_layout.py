@@ -0,0 +1,21 @@
+import os
+
+from ocr_cache import load_annotations
+from ocr_layout import cluster_rows
+
+FIXTURE = os.path.join(os.path.dirname(__file__), 'fixtures', 'annotations_rows.json')
+
+def load_fixture():
+    with open(FIXTURE, encoding='utf-8') as f: return load_annotations(f.read())
+
+def test_cluster_rows_from_recorded_annotations():
+    texts = load_fixture()
+    assert cluster_rows(texts[1:], 1000) == [
+        (1234567, "차 [서브] 가나다"),     # 30px 안쪽 앵커 중복 제거, 왼쪽 2%·숫자·앵커 오른쪽 조각 제외
+        (2000000, "바사 하늘"),            # cy 가 ty-100 인 조각 제외, by+100 직전까지 포함
+        (3000000, "바사 아자 하늘"),       # ty 차이가 정확히 30 이면 다른 행
+    ]
+
+def test_left_margin_scales_with_width():
+    texts = load_fixture()
+    assert cluster_rows(texts[1:], 2000)[0] == (1234567, "[서브] 가나다")   # 2% = 40px → cx 20 조각도 제외
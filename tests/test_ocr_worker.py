@@ -0,0 +1,148 @@
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+
+from fakes import FakeVisionClient, make_annotations, make_names
+from image_prep import STITCH_CONTEXT_PX
+from ocr_worker import DONE, FAILED, OcrWorker
+
+class RecordingClient(FakeVisionClient):
+    def __init__(self):
+        super().__init__([[]])
+        self.heights = []
+
+    def text_detection(self, image):
+        self.heights.append(cv2.imdecode(np.frombuffer(image.content, np.uint8), cv2.IMREAD_COLOR).shape[0])
+        return super().text_detection(image)
+
+def screenshots(tops, h=2400, w=1080):
+    """세로로 긴 목록을 tops 위치에서 잘라낸 스크롤 스크린샷들 (PNG)"""
+    page = np.random.default_rng(0).integers(0, 255, (max(tops) + h, w, 3), dtype=np.uint8)
+    page = cv2.GaussianBlur(page, (5, 5), 0)
+    return [(f"{i}.png", cv2.imencode('.png', page[t:t + h])[1].tobytes()) for i, t in enumerate(tops)]
+
+def run_worker(files):
+    worker = OcrWorker(creds=None, max_workers=1, client=(client := RecordingClient()))
+    worker.submit(files, [])
+    for job in list(worker._jobs.values()): job.future.result()
+    return worker, client
+
+def test_overlapping_upload_sends_only_unseen_rows():
+    worker, client = run_worker(screenshots([0, 800]))
+    assert all(j['상태'] == DONE for j in worker.snapshot())
+    first, second = client.heights
+    # 아래로 800px 스크롤 → 새로 보이는 800px + 앞 이미지와 이어 읽을 여유분만 보냄
+    assert second < first
+    assert second <= 800 + STITCH_CONTEXT_PX + 16
+
+class FailingClient(RecordingClient):
+    def __init__(self, fail_at):
+        super().__init__()
+        self.fail_at = fail_at
+
+    def text_detection(self, image):
+        if len(self.heights) == self.fail_at:
+            self.heights.append(None)
+            raise ValueError("잘못된 이미지")
+        return super().text_detection(image)
+
+def test_pool_shuts_down_when_idle_and_data_is_released():
+    worker, client = run_worker(screenshots([0, 800, 1600]))
+    assert worker._pool is None                          # 남은 작업이 없으면 스레드 풀을 내림
+    first, second, last = worker._jobs.values()
+    assert first.data is None and second.data is None    # 본인과 다음 작업이 끝나면 원본을 비움
+    assert last.data is not None                         # 다음 업로드의 겹침 기준
+    # 풀은 다음 업로드 때 다시 띄움
+    files = screenshots([0, 800, 1600, 2400])[3:]
+    worker.submit(files, [])
+    for job in list(worker._jobs.values()): job.future.result()
+    assert worker._pool is None and worker.snapshot()[-1]['상태'] == DONE
+    assert client.heights[-1] < client.heights[0]       # 남겨 둔 앞 이미지 기준으로 잘라 보냄
+    assert last.data is None
+
+def test_failed_job_keeps_data_for_retry():
+    worker = OcrWorker(creds=None, max_workers=1, client=FailingClient(fail_at=1))
+    worker.submit(screenshots([0, 800, 1600]), [])
+    for job in list(worker._jobs.values()): job.future.result()
+    first, failed, last = worker._jobs.values()
+    assert failed.status == FAILED
+    assert first.data is not None and failed.data is not None   # 다시 돌리면 둘 다 필요
+    worker.retry(failed.id)
+    failed.future.result()
+    assert failed.status == DONE and first.data is None and failed.data is None
+    assert worker._pool is None
+
+def test_clear_shuts_down_pool():
+    worker = OcrWorker(creds=None, max_workers=1, client=RecordingClient())
+    worker.submit(screenshots([0, 5000, 10000]), [])
+    pool = worker._pool
+    worker.clear()
+    assert worker._pool is None and pool._shutdown
+    assert worker.snapshot() == []
+
+def test_unrelated_and_repeated_uploads():
+    worker, client = run_worker(screenshots([0, 5000, 5000 + 0]))
+    assert len(client.heights) == 2            # 같은 내용은 submit 에서 건너뜀
+    assert client.heights[0] == client.heights[1]
+
+# --- 추출 결과: 잘라 보내도 통째로 보낼 때와 같은 행을 읽는지 ---
+ROW_H, HEAD, FOOT, H, W = 260, 200, 150, 2400, 1080
+
+def gray(img):
+    return cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+
+class ScreenVision(FakeVisionClient):
+    """받은 이미지가 몇 번째 스크린샷의 어디부터인지 찾아, 그 안에 온전히 들어온 서클원 행만 읽어 주는 Vision 대용"""
+
+    def __init__(self, shots, tops, names, fans):
+        super().__init__([[]])
+        self.shots, self.tops, self.names, self.fans = [gray(s) for s in shots], tops, names, fans
+        self.order = list(range(len(shots)))     # 호출 순서 → 스크린샷 번호
+
+    def text_detection(self, image):
+        super().text_detection(image)
+        crop = gray(cv2.imdecode(np.frombuffer(image.content, np.uint8), cv2.IMREAD_COLOR))
+        i = self.order[self.counter.total - 1]
+        off = cv2.minMaxLoc(cv2.matchTemplate(self.shots[i], crop[:64], cv2.TM_CCOEFF_NORMED))[3][1]
+        lo = self.tops[i] + max(off, HEAD) - HEAD                  # 받은 목록 구간 (page 좌표)
+        hi = self.tops[i] + min(off + len(crop), H - FOOT) - HEAD
+        ks = [k for k in range(len(self.names)) if lo <= k * ROW_H and (k + 1) * ROW_H <= hi]
+        top = ks[0] * ROW_H - lo + max(off, HEAD) - off if ks else 0
+        texts = make_annotations([self.names[k] for k in ks], [self.fans[k] for k in ks], W, ROW_H, top) if ks else []
+        return SimpleNamespace(text_annotations=texts)
+
+def game_screens(tops, n_rows=24):
+    """상단 바(맨 위 40줄은 시계처럼 장마다 다름) + 목록 + 하단 메뉴 모양의 스크롤 스크린샷들"""
+    rng = np.random.default_rng(7)
+    page = cv2.GaussianBlur(rng.integers(0, 255, (n_rows * ROW_H, W, 3), dtype=np.uint8), (5, 5), 0)
+    header, footer = rng.integers(0, 255, (HEAD, W, 3), dtype=np.uint8), rng.integers(0, 255, (FOOT, W, 3), dtype=np.uint8)
+    shots = []
+    for t in tops:
+        top = header.copy()
+        top[:40] = rng.integers(0, 255, (40, W, 3), dtype=np.uint8)
+        shots.append(np.vstack([top, page[t:t + H - HEAD - FOOT], footer]))
+    return shots
+
+def extract(shots, client, one_by_one=False):
+    files = [(f"{i}.png", cv2.imencode('.png', s)[1].tobytes()) for i, s in enumerate(shots)]
+    rows = []
+    for batch in ([[f] for f in files] if one_by_one else [files]):   # 따로 올리면 앞 이미지 없이 통째로
+        worker = OcrWorker(creds=None, max_workers=1, client=client)
+        worker.submit(batch, [])
+        for job in list(worker._jobs.values()): job.future.result()
+        assert all(j['상태'] == DONE for j in worker.snapshot())
+        rows += worker.rows()
+    return {r['닉네임']: r['팬 수'] for r in rows}
+
+def test_cropped_uploads_extract_same_rows_as_whole_images():
+    tops = [0, 1190, 2310, 3060]                # 행 경계와 안 맞는 스크롤 (앞 이미지 아래 끝에 걸친 행이 생김)
+    names, fans = make_names(24, seed=3), [10**6 + 7919 * k for k in range(24)]
+    shots = game_screens(tops)
+    whole = ScreenVision(shots, tops, names, fans)
+    cropped = ScreenVision(shots, tops, names, fans)
+    expected = extract(shots, whole, one_by_one=True)
+    got = extract(shots, cropped)
+    assert len(expected) > 15
+    assert got == expected
+    assert cropped.bytes_sent < whole.bytes_sent * 0.7
@@ -0,0 +1,10 @@
+from rollup import summary_grid
+
+def test_summary_drops_members_missing_from_daily():
+    summary = [['닉네임', '현재 팬 수', '이번달 팬수', '메모'],
+               ['가나', '100', '10', 'a'], ['탈퇴', '50', '5', 'b'], ['다라', '80', '8', 'c']]
+    grid = summary_grid(summary, ['다라', '가나', '마바'], {'가나': 120, '다라': 90, '마바': 7},
+                        {'가나': 30, '다라': 18, '마바': 0}, {'가나': '2026-10-17'})
+    assert [r[0] for r in grid] == ['닉네임', '가나', '다라', '마바']
+    assert grid[1][:4] == ['가나', 120, 30, 'a']
+    assert grid[2][:4] == ['다라', 90, 18, 'c']
@@ -0,0 +1,55 @@
+from fakes import FakeSession, FakeSpreadsheet
+from roster import ROSTER_SHEET, _blocks, apply_roster_changes, build_requests, plan_changes
+
+SNAPSHOT = ['닉네임', '가나', '다라', '마바', '사아', '자차']
+
+def results(report):
+    return [(r['결과'], r['메시지']) for r in report]
+
+def test_blocks_merge_adjacent_rows_bottom_first():
+    assert _blocks([5, 1, 2, 3, 7, 8]) == [(7, 9), (5, 6), (1, 4)]
+    assert _blocks([]) == []
+
+def test_adjacent_deletes_become_one_delete_request():
+    _, final, appended, deleted, rows = plan_changes(SNAPSHOT, [('delete', '다라'), ('delete', '사아'), ('delete', '마바')])
+    assert final == ['닉네임', '가나', '자차'] and deleted == [2, 3, 4]
+    reqs = build_requests(9, SNAPSHOT, rows, appended, deleted)
+    assert [r['deleteDimension']['range']['startIndex'] for r in reqs] == [2]
+    assert reqs[0]['deleteDimension']['range']['endIndex'] == 5
+
+def test_rename_queued_add():
+    report, final, appended, _, rows = plan_changes(SNAPSHOT, [('add', '카타'), ('rename', '카타', '파하')])
+    assert results(report) == [(True, "추가"), (True, "변경 성공")]
+    assert appended == ['파하'] and final[-1] == '파하'
+    assert rows == SNAPSHOT                    # 기존 행은 안 건드림
+
+def test_delete_then_re_add_restores_row():
+    report, final, appended, deleted, rows = plan_changes(SNAPSHOT, [('delete', '다라'), ('add', '다라')])
+    assert results(report) == [(True, "삭제"), (True, "추가 (삭제 취소)")]
+    assert (appended, deleted, final) == ([], [], SNAPSHOT)   # 행을 지웠다 새로 붙이지 않아 기록이 남음
+    assert build_requests(9, SNAPSHOT, rows, appended, deleted) == []
+
+def test_rename_onto_existing_name_fails():
+    report, final, *_ = plan_changes(SNAPSHOT, [('rename', '가나', '다라'), ('add', '하고'), ('rename', '마바', '하고')])
+    assert results(report) == [(False, "이미 존재하는 닉네임"), (True, "추가"), (False, "이미 존재하는 닉네임")]
+    assert final == SNAPSHOT + ['하고']
+
+def test_apply_without_roster_sheet():
+    sh = FakeSpreadsheet()
+    report, members = apply_roster_changes(FakeSession(sh), [('delete', '가나'), ('rename', '다라', '마바')])
+    assert results(report) == [(False, "대상 없음"), (False, "대상 없음")] and members == []
+    assert sh.counter.calls['batch_update'] == 0 and sh.counter.calls['add_worksheet'] == 0
+    # 추가가 있으면 머리글 행부터 만들어 붙임
+    report, members = apply_roster_changes(FakeSession(sh), [('add', '가나')])
+    assert members == ['가나']
+    assert sh.worksheet(ROSTER_SHEET).grid == [['닉네임'], ['가나']]
+
+def test_apply_sends_one_batch_update():
+    sh = FakeSpreadsheet()
+    sh.seed(ROSTER_SHEET, [[n, '1'] for n in SNAPSHOT])
+    ops = [('rename', '가나', '하기'), ('delete', '다라'), ('delete', '마바'), ('add', '카타')]
+    report, members = apply_roster_changes(FakeSession(sh), ops)
+    assert all(r['결과'] for r in report)
+    assert members == ['하기', '사아', '자차', '카타']
+    assert sh.counter.calls['batch_update'] == 1
+    assert [r[0] for r in sh.worksheet(ROSTER_SHEET).grid] == ['닉네임'] + members
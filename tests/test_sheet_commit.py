@@ -0,0 +1,130 @@
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from fakes import FakeSession, FakeSpreadsheet, make_names
+from history_store import HistoryStore
+from roster import apply_roster_changes
+from sheet_commit import KST, commit_daily
+from sheet_sync import monthly_columns, select_columns, weekly_columns
+
+NOW = datetime(2026, 10, 17, 21, 0, tzinfo=KST)
+MEMBERS, DAYS = 300, 60
+
+def make_sheet(names):
+    dates = [(NOW - timedelta(days=DAYS - i)).strftime("%Y-%m-%d") for i in range(DAYS)]
+    sh = FakeSpreadsheet()
+    sh.seed("2.일간_전체", [['닉네임'] + dates] + [[n] + [str(10**6 + i * 1000 + d) for d in range(DAYS)]
+                                                   for i, n in enumerate(names)])
+    return sh
+
+def commit(session, store, names, now, base):
+    sh = session.spreadsheet()
+    before = sh.cells_sent
+    confirmed = pd.DataFrame({'닉네임': names, '팬 수': [base + i for i in range(len(names))]})
+    commit_daily(session, store, confirmed, now)
+    return sh.cells_sent - before
+
+def test_warm_commit_with_new_member_sends_only_new_observations():
+    names = make_names(MEMBERS + 1)
+    members, newcomer = names[:MEMBERS], names[MEMBERS]
+    sh = make_sheet(members)
+    session, store = FakeSession(sh), HistoryStore(":memory:")
+
+    commit(session, store, members, NOW, 2 * 10**6)                      # cold: 로컬 사본 채움
+    assert store.valid
+    plain = commit(session, store, members, NOW + timedelta(minutes=5), 3 * 10**6)
+    joined = commit(session, store, members + [newcomer], NOW + timedelta(minutes=10), 4 * 10**6)
+
+    # 오늘 열 + 요약 몇 열 정도 (멤버 수에 비례), 전체 이력(멤버 × 날짜)을 다시 보내면 안 됨
+    assert plain < 10 * MEMBERS
+    assert joined < 10 * MEMBERS
+    assert joined - plain < DAYS + 20
+
+    daily = sh._sheets["2.일간_전체"].get_all_values()
+    assert daily[-1][0] == newcomer and daily[1][1] == str(10**6)
+
+def test_float_fans_from_editor_are_kept():
+    sh = FakeSpreadsheet()
+    sh.seed("2.일간_전체", [['닉네임', '2026-10-16'], ['가나', '100'], ['다라', '150.0']])
+    session, store = FakeSession(sh), HistoryStore(":memory:")
+    commit_daily(session, store, pd.DataFrame({'닉네임': ['가나'], '팬 수': [150.0]}), NOW)
+
+    assert store.last_dates() == {'가나': '2026-10-17', '다라': '2026-10-16'}
+    assert store.summary_stats('2026-10-17')[0] == {'가나': 150, '다라': 150}
+    summary = sh._sheets["1.메인_요약"].get_all_values()
+    assert summary[1][:2] == ['가나', '150'] and summary[1][-1] == '2026-10-17'
+    assert sh._sheets["2.일간_전체"].get_all_values()[1] == ['가나', '100', '150']
+
+def test_hand_edited_value_reloads_store():
+    names = make_names(20)
+    sh = make_sheet(names)
+    session, store = FakeSession(sh), HistoryStore(":memory:")
+    commit(session, store, names[:10], NOW, 2 * 10**6)
+
+    def reads(minutes, base):
+        before = sh.counter.calls['values_batch_get']
+        commit(session, store, names[:10], NOW + timedelta(minutes=minutes), base)
+        return sh.counter.calls['values_batch_get'] - before
+
+    assert reads(5, 3 * 10**6) == 1             # 아무도 안 고쳤으면 A열/헤더만 읽고 로컬 사본으로
+
+    # OCR 오인식을 시트에서 직접 고침 (오늘 반영 안 된 멤버의 어제 값)
+    sh.edit("2.일간_전체", 15, DAYS, "7777")
+    assert reads(10, 4 * 10**6) == 2            # 시트 전체를 다시 읽음
+    assert store.summary_stats('2026-10-17')[0][names[14]] == 7777
+    summary = {r[0]: r for r in sh._sheets["1.메인_요약"].get_all_values()}
+    assert summary[names[14]][1] == '7777'
+
+def test_hand_edit_reaches_weekly_and_monthly():
+    names = make_names(20)
+    sh = make_sheet(names)
+    session, store = FakeSession(sh), HistoryStore(":memory:")
+    commit(session, store, names, NOW, 2 * 10**6)
+
+    ci = sh._sheets["2.일간_전체"].grid[0].index('2026-10-08')
+    sh.edit("2.일간_전체", 4, ci, "5555")
+    commit(session, store, names, NOW + timedelta(minutes=5), 3 * 10**6)
+
+    weekly = sh._sheets["3.주간_기록"].get_all_values()
+    assert weekly[4][weekly[0].index('2026-10-08')] == '5555'
+    daily = sh._sheets["2.일간_전체"].get_all_values()
+    for title, pick in [("3.주간_기록", weekly_columns), ("4.월간_누적", monthly_columns)]:
+        assert sh._sheets[title].get_all_values() == select_columns(daily, pick(daily[0][1:]))
+
+def rollups_match_daily(sh):
+    daily = sh._sheets["2.일간_전체"].get_all_values()
+    return all(sh._sheets[title].get_all_values() == select_columns(daily, pick(daily[0][1:]))
+               for title, pick in [("3.주간_기록", weekly_columns), ("4.월간_누적", monthly_columns)])
+
+def test_roster_edit_then_commit_keeps_rollups_aligned():
+    dates = ['2026-10-01', '2026-10-06', '2026-10-07']
+    daily = [['닉네임'] + dates, ['A', '1000', '1100', '1200'], ['B', '2000', '2200', '2400'],
+             ['C', '3000', '3100', '3200'], ['D', '40', '45', '50']]
+    sh = FakeSpreadsheet()
+    sh.seed("2.일간_전체", daily)
+    sh.seed("3.주간_기록", select_columns(daily, weekly_columns(dates)))
+    sh.seed("4.월간_누적", select_columns(daily, monthly_columns(dates)))
+    session, store = FakeSession(sh), HistoryStore(":memory:")
+    commit_daily(session, store, pd.DataFrame({'닉네임': ['A'], '팬 수': [1300]}), datetime(2026, 10, 7, 21, tzinfo=KST))
+    assert store.valid and rollups_match_daily(sh)
+
+    report, members = apply_roster_changes(session, [('delete', 'B'), ('rename', 'C', 'C2'), ('add', 'E')])
+    assert all(r['결과'] for r in report) and members == ['A', 'C2', 'D', 'E']
+    commit_daily(session, store, pd.DataFrame({'닉네임': ['A', 'C2', 'D', 'E'], '팬 수': [1400, 3300, 55, 7]}),
+                 datetime(2026, 10, 8, 21, tzinfo=KST))
+
+    weekly = sh._sheets["3.주간_기록"].get_all_values()
+    assert weekly == [['닉네임', '2026-10-01', '2026-10-08'], ['A', '1000', '1400'], ['C2', '3000', '3300'],
+                      ['D', '40', '55'], ['E', '', '7']]
+    assert rollups_match_daily(sh)
+
+def test_stale_rollup_outline_forces_rebuild():
+    names = make_names(10)
+    sh = make_sheet(names)
+    session, store = FakeSession(sh), HistoryStore(":memory:")
+    commit(session, store, names, NOW, 2 * 10**6)
+    # 수정 시각이 아직 안 바뀐 채 (Drive 메타데이터 지연 등) 주간 시트 행이 어긋난 경우
+    del sh._sheets["3.주간_기록"].grid[3]
+    commit(session, store, names, NOW + timedelta(days=5), 3 * 10**6)    # 10-22: 주간 기준일
+    assert rollups_match_daily(sh)
@@ -1,11 +1,11 @@
 import streamlit as st
 import pandas as pd
-from google.oauth2 import service_account
-import gspread
-import os
 from textwrap import dedent
+from circles import CircleFeed, cross_ranking, fetch_all, load_registry
+from sheet_session import get_credentials, get_sheet_session
+from instrument import run
+from viewer_data import fetch_data
 
-FIXED_SHEET_URL = "https://docs.google.com/spreadsheets/d/18iVfULr8tjVB8FvZ1yfMuZhua2EDxRuwfut9k201_tI/edit?gid=19537121#gid=19537121"
 TARGET_GROWTH = 10000000 
 
 # [핵심] 툴바 모드를 'minimal'로 설정 (코드 레벨에서 제어)
@@ -56,71 +56,38 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+REGISTRY = load_registry()
 if 'page' not in st.session_state: st.session_state.page = 'home'
+if st.session_state.get('circle') not in REGISTRY:
+    circle = st.query_params.get('circle')   # ?circle=<id> 로 바로 열기
+    st.session_state.circle = circle if circle in REGISTRY else next(iter(REGISTRY))
 
-@st.cache_data(ttl=600)
-def load_data():
-    try:
-        if "gcp_service_account" in st.secrets:
-            creds = service_account.Credentials.from_service_account_info(st.secrets["gcp_service_account"])
-            scope = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
-            creds = creds.with_scopes(scope)
-        elif os.path.exists("secret.json"):
-            creds = service_account.Credentials.from_service_account_file("secret.json")
-            scope = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
-            creds = creds.with_scopes(scope)
-        else: return pd.DataFrame(), "인증 실패", {}
+def load_summary(session):
+    with run("viewer_load"): return fetch_data(session)
 
-        gc = gspread.authorize(creds)
-        sh = gc.open_by_url(FIXED_SHEET_URL)
-        
-        ws = sh.worksheet("1.메인_요약")
-        data = ws.get_all_records()
-        df = pd.DataFrame(data)
-        if not df.empty:
-            df['닉네임'] = df['닉네임'].astype(str)
-            for c in ['현재 팬 수', '이번달 팬수']:
-                if c in df.columns:
-                    df[c] = df[c].astype(str).str.replace(',', '').apply(pd.to_numeric, errors='coerce').fillna(0)
+@st.cache_resource
+def get_circle_feed(circle_id):
+    return CircleFeed(load_summary)
 
-        global_date = "-"
-        user_date_map = {}
-        
-        try:
-            ws_daily = sh.worksheet("2.일간_전체")
-            all_values = ws_daily.get_all_values()
-            
-            if len(all_values) > 1:
-                headers = all_values[0]
-                data_rows = all_values[1:]
-                
-                for col_i in range(len(headers) - 1, -1, -1):
-                    if headers[col_i].strip() == "닉네임": continue
-                    has_data = False
-                    for row in data_rows:
-                        if len(row) > col_i and str(row[col_i]).strip() != "":
-                            has_data = True
-                            break
-                    if has_data:
-                        global_date = headers[col_i]
-                        break
-                
-                for row in data_rows:
-                    nickname = str(row[0]).strip()
-                    my_last_date = "-"
-                    for col_i in range(len(headers) - 1, 0, -1):
-                        if col_i < len(row) and str(row[col_i]).strip() != "":
-                            my_last_date = headers[col_i]
-                            break
-                    user_date_map[nickname] = my_last_date
-        except Exception:
-            global_date = "-"
-        
-        return df, global_date, user_date_map
-
-    except: return pd.DataFrame(), "로드 실패", {}
+def load_all():
+    """모든 서클 요약을 동시에 읽음 → {서클 id: (df, 기준일, 날짜 맵, 검색 인덱스)}"""
+    try:
+        creds = get_credentials()
+        if creds is None: return {cid: (pd.DataFrame(), "인증 실패", {}, None) for cid in REGISTRY}
+        jobs = {cid: (get_circle_feed(cid), get_sheet_session(c.sheet_url, creds)) for cid, c in REGISTRY.items()}
+        results = fetch_all(jobs)
+    except Exception: results = {}
+    failed = (pd.DataFrame(), "로드 실패", {}, None)
+    out = {}
+    for cid in REGISTRY:
+        res = results.get(cid, failed)
+        out[cid] = failed if isinstance(res, Exception) else res   # 한 서클 실패가 다른 서클에 영향 없음
+    return out
 
-df, global_update_date, user_date_map = load_data()
+if len(REGISTRY) > 1:
+    st.selectbox("서클", list(REGISTRY), format_func=lambda cid: REGISTRY[cid].name, key='circle')
+all_data = load_all()
+df, global_update_date, user_date_map, search_index = all_data[st.session_state.circle]
 
 def show_home():
     st.title("내 기록 조회")
@@ -131,9 +98,12 @@ def show_home():
     search_query = st.text_input("닉네임 검색", placeholder="닉네임 입력...")
     target_user = None
     if search_query:
-        mask = df['닉네임'].str.contains(search_query, case=False)
-        if mask.any(): target_user = df[mask].iloc[0]
-        else: st.warning("검색 결과가 없습니다.")
+        hits = search_index.search(search_query)
+        if not hits: st.warning("검색 결과가 없습니다.")
+        elif len(hits) == 1: target_user = df.iloc[hits[0]]
+        else:
+            pick = st.selectbox(f"검색 결과 {len(hits)}건", hits, format_func=lambda i: df.iloc[i]['닉네임'])
+            target_user = df.iloc[pick]
     
     if target_user is not None:
         user_nick = target_user['닉네임']
@@ -177,6 +147,13 @@ def show_list():
     with tab1: st.dataframe(df.sort_values('이번달 팬수', ascending=False)[['닉네임', '이번달 팬수']], use_container_width=True, hide_index=True)
     with tab2: st.dataframe(df.sort_values('현재 팬 수', ascending=False)[['닉네임', '현재 팬 수']], use_container_width=True, hide_index=True)
 
+    if len(REGISTRY) > 1:
+        st.subheader("서클 통합 랭킹")
+        frames = {cid: data[0] for cid, data in all_data.items()}
+        tab3, tab4 = st.tabs(["이번달 팬수 순", "총 팬 수 순"])
+        with tab3: st.dataframe(cross_ranking(frames, REGISTRY, '이번달 팬수'), use_container_width=True, hide_index=True)
+        with tab4: st.dataframe(cross_ranking(frames, REGISTRY, '현재 팬 수'), use_container_width=True, hide_index=True)
+
 if st.session_state.page == 'home': show_home()
 elif st.session_state.page == 'list': show_list()
 st.write("---")
@@ -0,0 +1,41 @@
+import threading
+
+class VersionedCache:
+    """버전 스탬프가 바뀌면 백그라운드에서 다시 로드하고, 그동안은 이전 값을 계속 돌려줌 (stale-while-revalidate)
+    프로세스당 하나 (st.cache_resource) 두고 모든 방문자가 같이 씀"""
+
+    def __init__(self, loader):
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._entry = None          # (version, value) — 통째로 바꿔 끼움
+        self._refreshing = None     # 로드 중인 version
+
+    @property
+    def version(self):
+        entry = self._entry
+        return entry[0] if entry else None
+
+    def _load(self, version, *args):
+        value = self._loader(*args)
+        with self._lock:
+            self._entry = (version, value)
+
+    def _refresh(self, version, *args):
+        try: self._load(version, *args)
+        except Exception: pass      # 실패하면 이전 값 유지, 다음 요청 때 다시 시도
+        finally:
+            with self._lock:
+                if self._refreshing == version: self._refreshing = None
+
+    def get(self, version, *args):
+        """처음엔 동기 로드, 이후 버전이 바뀌면 백그라운드 로드 후 교체"""
+        entry = self._entry
+        if entry is None:
+            self._load(version, *args)
+            return self._entry[1]
+        if entry[0] != version:
+            with self._lock:
+                start = self._refreshing != version
+                if start: self._refreshing = version
+            if start: threading.Thread(target=self._refresh, args=(version, *args), daemon=True).start()
+        return entry[1]
@@ -0,0 +1,36 @@
+import pandas as pd
+
+from daily_table import last_dates, LAST_DATE_COL
+from instrument import span
+from nickname_index import NicknameSearch
+
+def fetch_data(session):
+    """시트에서 바로 읽음 (캐시 없음). 실패하면 예외 → 이전 캐시 유지"""
+    with span("sheet_read"):
+        ws = session.worksheet("1.메인_요약")
+        data = ws.get_all_records()
+    df = pd.DataFrame(data)
+    if not df.empty:
+        df['닉네임'] = df['닉네임'].astype(str)
+        for c in ['현재 팬 수', '이번달 팬수']:
+            if c in df.columns:
+                df[c] = df[c].astype(str).str.replace(',', '').apply(pd.to_numeric, errors='coerce').fillna(0)
+
+    global_date = "-"
+    user_date_map = {}
+
+    if LAST_DATE_COL in df.columns:
+        # admin 이 기록해 둔 마지막 집계일 사용 → 일간 시트는 안 읽음
+        dates = df[LAST_DATE_COL].astype(str).str.strip()
+        user_date_map = dict(zip(df['닉네임'].str.strip(), dates))
+        real = dates[(dates != "") & (dates != "-")]
+        if not real.empty: global_date = real.max()
+    else:
+        try:
+            with span("sheet_read"): grid = session.worksheet("2.일간_전체").get_all_values()
+            with span("last_dates"): global_date, user_date_map = last_dates(grid)
+        except Exception:
+            global_date = "-"
+
+    with span("search_index"): search = NicknameSearch(df['닉네임'] if not df.empty else [])
+    return df, global_date, user_date_map, search